@@ -0,0 +1,49 @@
+"""Measure the time to import pyuia packages, each in a fresh interpreter.
+
+Also reports heavy modules (Selenium, Robot Framework and PIL) loaded as a
+side effect, which are supposed to be imported only when they are used.
+
+Usage:
+
+    python benchmarks/import_time.py [--repeat 10] [module ...]
+
+"""
+import os, sys, argparse, subprocess
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+_MODULES = ['pyuia', 'pyuia.selenium', 'pyuia.appium']
+_HEAVY_MODULES = ['selenium', 'robot', 'PIL']
+
+_SCRIPT = '''
+import sys, time
+sys.path.insert(0, %r)
+start = time.time()
+import %s
+elapsed = time.time() - start
+print(elapsed)
+print(' '.join(m for m in %r if m in sys.modules))
+'''
+
+def measure(module, repeat):
+    """Return the median import time (in seconds) and heavy modules loaded."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _SCRIPT % (_ROOT, module, _HEAVY_MODULES)])
+        elapsed, loaded = (output.decode('utf-8').split('\n') + [''])[:2]
+        timings.append(float(elapsed))
+    timings.sort()
+    return timings[len(timings) // 2], loaded.split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=10, help='imports per module')
+    parser.add_argument('modules', nargs='*', default=_MODULES, help='modules to import')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        elapsed, loaded = measure(module, args.repeat)
+        print('%-16s %8.2f ms  heavy modules loaded: %s' % (
+            module, elapsed * 1000, ', '.join(loaded) or '(none)'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Measure the memory footprint of page objects, per thousand pages.
+
+Pages are instantiated against a dummy context, each with its elements cache
+filled, and the memory owned by a page (the instance, its `__dict__` if any,
+and the elements cache) is summed with `sys.getsizeof`. A page class that
+declares `__slots__ = ()` is compared with one that doesn't.
+
+Usage:
+
+    python benchmarks/page_footprint.py [--pages 1000] [--cached 10]
+
+"""
+import os, sys, argparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pyuia import AppContext, PageObject, cacheable
+from pyuia.pageobject import _ELEMENTS_CACHE_ATTR
+
+class _Context(AppContext):
+
+    def __init__(self):
+        AppContext.__init__(self, 'benchmark')
+
+def _define_pages(cached):
+    lookups = dict(('element%d' % i, cacheable(lambda self, i=i: i)) for i in range(cached))
+    slotted = type('SlottedPage', (PageObject,), dict(lookups, __slots__=()))
+    unslotted = type('UnslottedPage', (PageObject,), dict(lookups))
+    return slotted, unslotted
+
+def _footprint(page):
+    size = sys.getsizeof(page)
+    if hasattr(page, '__dict__'):
+        size += sys.getsizeof(page.__dict__)
+    cache = getattr(page, _ELEMENTS_CACHE_ATTR, None)
+    if cache is not None:
+        size += sys.getsizeof(cache)
+    return size
+
+def measure(page_class, pages, cached):
+    context = _Context()
+    instances = []
+    for _ in range(pages):
+        page = page_class(context, None)
+        for i in range(cached):
+            getattr(page, 'element%d' % i)()
+        instances.append(page)
+    return sum(_footprint(page) for page in instances)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pages', type=int, default=1000, help='pages to instantiate')
+    parser.add_argument('--cached', type=int, default=10, help='elements cached per page')
+    args = parser.parse_args()
+
+    per_thousand = 1000.0 / args.pages
+    for page_class in _define_pages(args.cached):
+        size = measure(page_class, args.pages, args.cached)
+        print('%-14s %10.1f KiB per 1000 pages' % (page_class.__name__, size * per_thousand / 1024))
+
+if __name__ == '__main__':
+    main()
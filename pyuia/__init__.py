@@ -1,4 +1,7 @@
 from exceptions import *
 from context import *
 from pageobject import *
+from stats import *
+from timing import *
+from navigation import *
 
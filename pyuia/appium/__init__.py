@@ -1,4 +1,6 @@
 from pageobject import *
 from context import *
 from util import *
+from gesture import *
+from tree import *
 
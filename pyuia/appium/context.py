@@ -1,35 +1,172 @@
+import time, logging
 from ..selenium import SeleniumContext
 from .util import get_logs
+from .tree import ElementIndex
 
 __all__ = ['AppiumContext']
+_logger = logging.getLogger(__name__)
 
 class AppiumContext(SeleniumContext):
 
+    # Strategies to reset app state, from the cheapest to the most expensive:
+    #  - clear_data: clear app data (`mobile: clearApp`), and then launch the app.
+    #    On Android, it revokes runtime permissions as well, which are granted
+    #    again if `autoGrantPermissions` is set, as reinstalling does; if they
+    #    cannot be, the strategy is considered unsupported.
+    #  - snapshot: restore a snapshot. Not tried by default; subclasses that
+    #    implement `_restore_snapshot` add it to `_RESET_STRATEGIES`.
+    #  - reinstall: remove the app, and then launch (reinstall) it. If `app_path`
+    #    is specified, the locally cached binary is installed instead.
+    #  - terminate_activate: restart the app. Note that app data is kept.
+    # If `reset_strategy` is not specified, the cheapest one that works is used.
+    _RESET_STRATEGIES = ['clear_data', 'reinstall']
+
+    def __init__(self, driver, reset_strategy=None, app_path=None, implicit_wait=None):
+        SeleniumContext.__init__(self, driver, implicit_wait)
+        self.reset_strategy = reset_strategy
+        self.app_path = app_path
+        self.reset_timings = [] # [(strategy, seconds)]
+        self._app_id = None
+        self._unsupported_resets = set()
+        self._element_index = None
+        self.log_filter = None # a `LogFilter` applied to device logs
+
     def dump_page_source(self):
         return (self.driver.page_source, 'xml')
 
+    def get_element_index(self):
+        """Return an `ElementIndex` of the memoized page source."""
+        if self._element_index is None:
+            self._element_index = ElementIndex(self.get_page_tree())
+        return self._element_index
+
+    def invalidate_page_source(self):
+        SeleniumContext.invalidate_page_source(self)
+        self._element_index = None
+
     def get_new_logs(self):
         log_type = 'syslog' if self.platform == 'iOS' else 'logcat'
-        return get_logs(self.driver, log_type)
+        return get_logs(self.driver, log_type, self.log_filter)
 
     def open_app(self, reset):
         if reset:
-            # "remove -> launch" is more efficient than "launch -> reset"
-            self._remove_app()
-            self.driver.launch_app()
+            self._reset_app()
         else:
             self.driver.launch_app()
+        self._resolve_log_pids() # the app process may have changed
 
-    def _remove_app(self):
+    def _resolve_log_pids(self):
+        """Resolve packages (bundle IDs) of the log filter to PIDs."""
+        log_filter = self.log_filter
+        if not (log_filter and log_filter.packages): return
+        from selenium.common.exceptions import WebDriverException
+
+        pids = []
+        for package in log_filter.packages:
+            try:
+                pids.extend(self._get_pids(package))
+            except WebDriverException:
+                _logger.warning('Fail to resolve the PID of %s. Logs are not filtered by it.',
+                                package, exc_info=True)
+        log_filter.resolved_pids = pids
+
+    def _get_pids(self, package):
+        if self.platform == 'iOS': # the app in the foreground only
+            info = self.driver.execute_script('mobile: activeAppInfo')
+            return [info['pid']] if info.get('bundleId') == package else []
+
+        # requires the server to allow 'adb_shell' (--relaxed-security)
+        output = self.driver.execute_script('mobile: shell', {'command': 'pidof', 'args': [package]})
+        return output.split()
+
+    def open_shortcut(self, shortcut):
+        """Open a deep link, or start an Android activity given as (package, activity)."""
+        if isinstance(shortcut, tuple):
+            self.start_activity(*shortcut)
+        else:
+            self.open_deep_link(shortcut)
+
+    def open_deep_link(self, url, app_id=None):
+        """Open the URL with the app (defaults to the app under test)."""
+        app_id = app_id or self._get_app_id()
+        if self.platform == 'iOS':
+            self.driver.execute_script('mobile: deepLink', {'url': url, 'bundleId': app_id})
+        else:
+            self.driver.execute_script('mobile: deepLink', {'url': url, 'package': app_id})
+
+    def start_activity(self, package, activity):
+        """Start an Android activity, which must be exported."""
+        self.driver.start_activity(package, activity)
+
+    def _reset_app(self):
+        from selenium.common.exceptions import WebDriverException
+        if self.reset_strategy:
+            strategies = [self.reset_strategy]
+        else:
+            strategies = [s for s in self._RESET_STRATEGIES if s not in self._unsupported_resets]
+
+        for strategy in strategies:
+            start_time = time.time()
+            try:
+                getattr(self, '_reset_by_%s' % strategy)()
+            except (NotImplementedError, WebDriverException):
+                if self.reset_strategy or strategy == strategies[-1]: raise
+                _logger.debug('Reset strategy (%s) is not supported.', strategy, exc_info=True)
+                self._unsupported_resets.add(strategy)
+                continue
+
+            elapsed = time.time() - start_time
+            _logger.debug('App reset by [%s]. Time elapsed = [%s]s.', strategy, elapsed)
+            self.reset_timings.append((strategy, elapsed))
+            return
+
+    def _reset_by_clear_data(self):
+        app_id = self._get_app_id()
         caps = self.driver.capabilities
-        platform = caps['platformName']
-        if platform == 'Android':
-            self.driver.remove_app(caps['appPackage'])
-        elif platform == 'iOS':
-            self.driver.remove_app(caps['bundleId'])
+        if caps['platformName'] == 'iOS':
+            self.driver.execute_script('mobile: clearApp', {'bundleId': app_id})
         else:
-            assert False, platform
+            self.driver.execute_script('mobile: clearApp', {'appId': app_id})
+            if caps.get('autoGrantPermissions') or caps.get('appium:autoGrantPermissions'):
+                self.driver.execute_script('mobile: changePermissions',
+                                           {'permissions': 'all', 'appPackage': app_id})
+        self.driver.launch_app()
+
+    def _reset_by_snapshot(self):
+        self._restore_snapshot()
+
+    def _restore_snapshot(self):
+        """Restore the device (or simulator/emulator) to a snapshot taken with
+        the app freshly installed, and launch the app. Appium doesn't support
+        this in general, so it is up to subclasses."""
+        raise NotImplementedError()
+
+    def _reset_by_reinstall(self):
+        # "remove -> launch" is more efficient than "launch -> reset"
+        self._remove_app()
+        if self.app_path:
+            self.driver.install_app(self.app_path)
+        self.driver.launch_app()
+
+    def _reset_by_terminate_activate(self):
+        app_id = self._get_app_id()
+        self.driver.terminate_app(app_id)
+        self.driver.activate_app(app_id)
+
+    def _get_app_id(self):
+        if not self._app_id:
+            caps = self.driver.capabilities
+            platform = caps['platformName']
+            if platform == 'Android':
+                self._app_id = caps['appPackage']
+            elif platform == 'iOS':
+                self._app_id = caps['bundleId']
+            else:
+                assert False, platform
+        return self._app_id
+
+    def _remove_app(self):
+        self.driver.remove_app(self._get_app_id())
 
     def close_app(self):
         self.driver.close_app()
-
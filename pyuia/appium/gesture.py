@@ -0,0 +1,115 @@
+import time, math, weakref, logging
+
+__all__ = ['Gesture', 'swipe_duration']
+_logger = logging.getLogger(__name__)
+
+# velocity model of swipes: pixels per millisecond, and bounds of the duration
+_SWIPE_VELOCITY = 1.5
+_MIN_SWIPE_DURATION = 200
+_MAX_SWIPE_DURATION = 1000
+
+_TAP_DURATION = 50
+_SWIPE_HOLD_DURATION = 100 # hold still before lifting the finger, or a swipe becomes a fling
+_legacy_drivers = weakref.WeakKeyDictionary() # drivers not supporting W3C actions
+
+def swipe_duration(x1, y1, x2, y2):
+    """Return the duration (in ms) of a swipe, which is proportional to the
+    distance but bounded."""
+    distance = math.hypot(x2 - x1, y2 - y1)
+    return int(min(max(distance / _SWIPE_VELOCITY, _MIN_SWIPE_DURATION), _MAX_SWIPE_DURATION))
+
+class Gesture(object):
+    """A sequence of touch actions performed in a single (W3C actions) request.
+
+    Example:
+
+        Gesture(driver).swipe(100, 800, 100, 200).pause(300).tap(50, 50).perform()
+
+    If the driver doesn't support W3C actions, the actions are performed one
+    by one with legacy `driver.swipe` and `driver.tap`.
+
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._ops = [] # [(op, args)]
+
+    def tap(self, x, y):
+        self._ops.append(('tap', (x, y)))
+        return self
+
+    def swipe(self, x1, y1, x2, y2, duration=None):
+        if duration is None:
+            duration = swipe_duration(x1, y1, x2, y2)
+        self._ops.append(('swipe', (x1, y1, x2, y2, duration)))
+        return self
+
+    def pause(self, duration):
+        """Pause for `duration` milliseconds, e.g., to let a fling settle."""
+        self._ops.append(('pause', (duration,)))
+        return self
+
+    def perform(self):
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.remote.command import Command
+        if not self._ops: return
+
+        if self._driver not in _legacy_drivers:
+            try:
+                self._driver.execute(Command.W3C_ACTIONS, self._to_w3c_actions())
+                return
+            except WebDriverException as e:
+                if not _is_unsupported(e): raise
+                _logger.debug('W3C actions are not supported. Fall back to legacy gestures.', exc_info=True)
+                _legacy_drivers[self._driver] = True
+
+        for op, args in self._ops:
+            if op == 'tap':
+                self._driver.tap([args], _TAP_DURATION)
+            elif op == 'swipe':
+                self._driver.swipe(*args)
+            else:
+                time.sleep(args[0] / 1000.0)
+
+    def _to_w3c_actions(self):
+        actions = []
+        for op, args in self._ops:
+            if op == 'tap':
+                x, y = args
+                actions.extend([
+                    _move(x, y, 0), _down(), _pause(_TAP_DURATION), _up()])
+            elif op == 'swipe':
+                x1, y1, x2, y2, duration = args
+                actions.extend([
+                    _move(x1, y1, 0), _down(), _move(x2, y2, duration),
+                    _pause(_SWIPE_HOLD_DURATION), _up()])
+            else:
+                actions.append(_pause(args[0]))
+
+        return {'actions': [{
+            'type': 'pointer',
+            'id': 'finger1',
+            'parameters': {'pointerType': 'touch'},
+            'actions': actions }]}
+
+_UNSUPPORTED_ERRORS = ('unknown command', 'unknown method', 'not implemented', 'not yet been implemented')
+
+def _is_unsupported(error):
+    """Whether the error says the command is unknown to the driver, rather than
+    the actions failed."""
+    if type(error).__name__ in ('UnknownMethodException', 'UnknownCommandException'):
+        return True
+    msg = (getattr(error, 'msg', None) or str(error)).lower()
+    return any(text in msg for text in _UNSUPPORTED_ERRORS)
+
+def _move(x, y, duration):
+    return {'type': 'pointerMove', 'duration': duration, 'origin': 'viewport', 'x': int(x), 'y': int(y)}
+
+def _down():
+    return {'type': 'pointerDown', 'button': 0}
+
+def _up():
+    return {'type': 'pointerUp', 'button': 0}
+
+def _pause(duration):
+    return {'type': 'pause', 'duration': duration}
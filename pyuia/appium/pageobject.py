@@ -1,34 +1,49 @@
-import time, sys
+import sys
 from ..selenium import SeleniumPageObject, cacheable
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
-from selenium.webdriver.common.by import By
+from ..selenium.pageobject import _resolve_context, _refresh_context, _absolute_xpath, _compose_xpath, _probing, \
+    _selenium_exceptions
+from .gesture import Gesture
+from .tree import LocalElement
 
 __all__ = ['AppiumPageObject', 'find_by', 'cacheable']
 
 class AppiumPageObject(SeleniumPageObject):
 
+    __slots__ = ()
+
+    # how `find_by(name=...)` locators are resolved; 'xpath', or 'index' to
+    # consult an index of page source first (see `AppiumContext.get_element_index`)
+    # within polls, where page source is refreshed.
+    _NAME_LOOKUP = 'xpath'
+
     def _press_menu(self):
         self._driver.keyevent(82)
-        time.sleep(1) # or then menu may not in the subsequent screenshot.
+        self._wait_stable() # or then menu may not in the subsequent screenshot.
 
     def _press_back(self):
         self._driver.keyevent(4)
 
+    def _gesture(self):
+        """Return a `Gesture` to combine taps and swipes into a single request."""
+        return Gesture(self._driver)
+
+# the values of `selenium.webdriver.common.by.By`, which is not imported until needed.
 _strategy_kwargs = {
-    'id_': By.ID,
-    'xpath': By.XPATH,
-    'link_text': By.LINK_TEXT,
-    'partial_link_text': By.PARTIAL_LINK_TEXT,
-    'name': By.NAME,
-    'tag_name': By.TAG_NAME,
-    'class_name': By.CLASS_NAME,
-    'css_selector': By.CSS_SELECTOR }
+    'id_': 'id',
+    'xpath': 'xpath',
+    'link_text': 'link text',
+    'partial_link_text': 'partial link text',
+    'name': 'name',
+    'tag_name': 'tag name',
+    'class_name': 'class name',
+    'css_selector': 'css selector' }
 
 from pyuia import cacheable as cacheable_decorator # naming conflict between global and parameter names
 
 def find_by(how=None, using=None, multiple=False, cacheable=True, if_exists=False,
             context=None, scrollable=False, scroll_forward=True, scroll_vertically=True,
-            scroll_starting_padding=None, scroll_ending_padding=None, maximum_scrolls=5, driver_attr='_driver', **kwargs):
+            scroll_starting_padding=None, scroll_ending_padding=None, maximum_scrolls=5, driver_attr='_driver',
+            local=False, **kwargs):
     """Create a callable which can be evaluated lazily to find UI elements.
 
     This function implements the concept mentioned in Page Factory (or PageFactory) pattern (https://code.google.com/p/selenium/wiki/PageFactory). It helps to reduce the amount of boilerplate code while implementing page objects. For more details, see https://jeremykao.wordpress.com/2015/06/10/pagefactory-pattern-in-python/.
@@ -51,6 +66,12 @@ def find_by(how=None, using=None, multiple=False, cacheable=True, if_exists=Fals
         scroll_ending_padding: No-touch ending zone. Defaults to `None`.
         maximum_scrolls: The maximum number of attempts to scroll. Defaults to 5.
         driver_attr: The attribute name for getting the reference to WebDriver. Defaults to '_driver'.
+        local: Whether to look up the element(s) in (memoized) page source, and
+            return `LocalElement`s that go to the driver only if an interactable
+            element is needed. It works for the id, name, class name and
+            accessibility id strategies without `context` or `scrollable`, and
+            only within polls (e.g., waits), where page source is refreshed;
+            elsewhere the driver is asked as usual. Defaults to `False`.
 
     Kwargs:
         The following keyword arguments are supported for various locator strategies: id_ (to avoid conflict with the built-in keyword id), name, class_name, css_selector, tag_name, xpath, link_text, and partial_link_text.
@@ -59,77 +80,161 @@ def find_by(how=None, using=None, multiple=False, cacheable=True, if_exists=Fals
 
     """
     # 'how' AND 'using' take precedence over keyword arguments
-
-    # If _how == 'name', we will replace it by 'xpath' in func.
-    # However, since variable cannot be updated in different scope (i.e., find_by & func here),
-    # We use dictionary instead.
-    method_dic = {'_how':how, '_using': using}
-
-    if not (method_dic['_how'] and method_dic['_using']):
+    _how, _using = how, using
+    if not (_how and _using):
         if len(kwargs) != 1 or kwargs.keys()[0] not in _strategy_kwargs.keys() :
             raise ValueError(
                 "If 'how' AND 'using' are not specified, one and only one of the following "
                 "valid keyword arguments should be provided: %s." % _strategy_kwargs.keys())
 
         key = kwargs.keys()[0]
-        method_dic['_how'], method_dic['_using'] = _strategy_kwargs[key], kwargs[key]
+        _how, _using = _strategy_kwargs[key], kwargs[key]
+
+    global_lookup = context is None and not scrollable # of the whole page
+    local_query = (_how, _using) if local and global_lookup else None
+
+    # For appium v1.5.0+, since it doesn't support find by name strategy, we have to adjust our pyuia
+    # We replace name with xpath, scoped under the context element (if any)
+    # Github release note: https://github.com/appium/appium/releases/tag/v1.5.0
+    # Discuss thread: https://discuss.appium.io/t/appium-1-5-fails-to-find-element-by-name/8857/10
+    name = _using if _how == 'name' else None
+    if name is not None:
+        _how, _using = 'xpath', _name_to_xpath(name, scoped=context is not None)
+
+    # look up with a single query, if the context is not cacheable anyway.
+    composed_xpath = _compose_xpath(_how, _using, context) if not scrollable else None
 
     def func(page_object):
+        exceptions = _selenium_exceptions()
         driver = getattr(page_object, driver_attr)
 
-        # For appium v1.5.0+, since it doesn't support find by name strategy, we have to adjust our pyuia
-        # We replace name with xpath
-        # Github release note: https://github.com/appium/appium/releases/tag/v1.5.0
-        # Discuss thread: https://discuss.appium.io/t/appium-1-5-fails-to-find-element-by-name/8857/10
-
-        if method_dic['_how'] == 'name':
-            method_dic['_how'] = 'xpath'
-            method_dic['_using'] = "//*[@text='" + method_dic['_using'] + "' or @content-desc='" + method_dic['_using'] + "']"
+        how, using = ('xpath', composed_xpath) if composed_xpath else (_how, _using)
+        if name is not None and global_lookup and getattr(page_object, '_NAME_LOOKUP', None) == 'index' \
+                and _in_poll(page_object):
+            nodes = page_object._context.get_element_index().find('name', name)
+            if not nodes:
+                if if_exists: return None
+                raise exceptions.NoSuchElementException(
+                    "Element not found in page source; find_by(name=%s, multiple=%s)" % (repr(name), multiple))
+            how, using = _name_query(page_object._context.platform, name, nodes)
 
         # ctx - driver or a certain element
-        if context is None:
+        if context is None or composed_xpath:
             ctx = driver
             container = None
         elif callable(context):
-            container = ctx = context(page_object)
+            container = ctx = _resolve_context(page_object, context)
             if not ctx:
                 if if_exists:
                     return None
                 else:
-                    raise NoSuchElementException("The element as the context doesn't exist.")
+                    raise exceptions.NoSuchElementException("The element as the context doesn't exist.")
         else: # element
             container = ctx = context
 
-        lookup = ctx.find_elements if multiple else ctx.find_element
-
         scrolls = 0;
+        recovered = False
 
         while True:
+            lookup = ctx.find_elements if multiple else ctx.find_element
             try:
-                return lookup(method_dic['_how'], method_dic['_using'])
+                return lookup(how, using)
+
+            except exceptions.StaleElementReferenceException:
+                # the (cached) context has gone stale; re-resolve it once.
+                if recovered or not callable(context): raise
+                container = ctx = _refresh_context(page_object, context)
+                recovered = True
+                if not ctx:
+                    if if_exists: return None
+                    raise exceptions.NoSuchElementException("The element as the context doesn't exist.")
 
-            except NoSuchElementException as e:
+            except exceptions.NoSuchElementException as e:
 
                 if not scrollable or scrolls == maximum_scrolls:
                     if if_exists: return None
                     msg = "%s ; find_by(how='%s', using='%s', multiple=%s, cacheable=%s, " \
                           "if_exists=%s, context=%s, scrollable=%s)" % \
-                          (str(e), method_dic['_how'], method_dic['_using'], multiple, cacheable, if_exists, context, scrollable)
-                    raise NoSuchElementException(msg), None, sys.exc_info()[2]
+                          (str(e), how, using, multiple, cacheable, if_exists, context, scrollable)
+                    raise exceptions.NoSuchElementException(msg), None, sys.exc_info()[2]
 
                 scroller = _get_scroller(page_object, container, scrollable)
                 _scroll(page_object, driver, scroller, scroll_forward,
                         scroll_vertically, scroll_starting_padding, scroll_ending_padding)
                 scrolls += 1
 
+    func = _probing(func) if if_exists else func
     func = cacheable_decorator(func, cache_none=not if_exists) if cacheable else func
+    func = _local_first(func, local_query, multiple, if_exists, driver_attr) if local_query else func
 
     # for debugging, expose criteria of the lookup
     func.__name__ = "find_by(how='%s', using=%s, multiple=%s, cacheable=%s, " \
                     "if_exists=%s, context=%s, scrollable=%s)" % \
-                    (method_dic['_how'], repr(method_dic['_using']), multiple, cacheable, if_exists, context, scrollable)
+                    (_how, repr(_using), multiple, cacheable, if_exists, context, scrollable)
+
+    # for child lookups to resolve the context (see `_compose_xpath`)
+    func._pyuia_xpath = None if multiple or scrollable else _absolute_xpath(_how, _using, context)
+    func._pyuia_cacheable = cacheable
     return func
 
+def _name_to_xpath(name, scoped=False):
+    return ".//*[@text='%s' or @content-desc='%s']" % (name, name) if scoped else \
+           "//*[@text='%s' or @content-desc='%s']" % (name, name)
+
+def _quote(value):
+    return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+
+def _name_query(platform, name, nodes):
+    """Return a locator that finds elements having the name faster than XPath,
+    given the nodes of the name in page source."""
+    if platform == 'iOS':
+        return '-ios predicate string', 'name == %s OR label == %s' % (_quote(name), _quote(name))
+
+    attrs = set('text' if node.get('text') == name else 'content-desc' for node in nodes)
+    if attrs == set(['text']):
+        return '-android uiautomator', 'new UiSelector().text(%s)' % _quote(name)
+    elif attrs == set(['content-desc']):
+        return '-android uiautomator', 'new UiSelector().description(%s)' % _quote(name)
+    else: # mixed
+        return 'xpath', _name_to_xpath(name)
+
+def _in_poll(page_object):
+    return getattr(page_object, '_poll_cache', None) is not None
+
+def _local_first(lookup, local_query, multiple, if_exists, driver_attr):
+    """Answer the lookup from page source within polls, and go to `lookup`
+    otherwise. Local results bypass the elements cache, or they would outlive
+    the page source they come from."""
+    def func(page_object):
+        # page source is only assumed up to date within a poll, see `PageObject._start_poll`.
+        if _in_poll(page_object):
+            driver = getattr(page_object, driver_attr)
+            elements = _find_locally(page_object, driver, multiple, *local_query)
+            if elements is not None: # supported
+                if elements: return elements if multiple else elements[0]
+                if if_exists: return None
+                raise _selenium_exceptions().NoSuchElementException(
+                    "Element not found in page source; find_by(how='%s', using=%s, multiple=%s, local=True)" %
+                    (local_query[0], repr(local_query[1]), multiple))
+        return lookup(page_object)
+
+    func.__dict__.update(lookup.__dict__) # e.g., `invalidate` of cacheable lookups
+    return func
+
+def _find_locally(page_object, driver, multiple, how, using):
+    nodes = page_object._context.get_element_index().find(how, using)
+    if nodes is None: return None
+    if not nodes: return [] # not found
+
+    if how == 'name': # not supported by appium v1.5.0+
+        how, using = _name_query(page_object._context.platform, using, nodes)
+
+    if multiple:
+        resolvers = [lambda i=i: driver.find_elements(how, using)[i] for i in range(len(nodes))]
+        return [LocalElement(node, resolver) for node, resolver in zip(nodes, resolvers)]
+    else:
+        return [LocalElement(nodes[0], lambda: driver.find_element(how, using))]
+
 def _get_scroller(page_object, container, scrollable):
     if callable(scrollable): # find_by
         scroller = scrollable(page_object)
@@ -144,7 +249,9 @@ def _get_scroller(page_object, container, scrollable):
     else: # element
         return scrollable
 
-def _scroll(page_object, driver, scroller, forward, vertically, starting_padding, ending_padding):
+_SCROLL_SETTLE_DURATION = 300 # ms, between successive scrolls
+
+def _scroll(page_object, driver, scroller, forward, vertically, starting_padding, ending_padding, times=1):
     loc, size = scroller.location, scroller.size
     x, y, w, h = loc['x'], loc['y'], size['width'], size['height']
 
@@ -201,4 +308,10 @@ def _scroll(page_object, driver, scroller, forward, vertically, starting_padding
                 y2 = y + h + 1 if forward else y - 1
             else:
                 x2 = x + w + 1 if forward else x - 1
-    driver.swipe(x1, y1, x2, y2, abs(x1-x2+y1-y2)*3)
+
+    gesture = Gesture(driver)
+    for i in range(times):
+        if i: gesture.pause(_SCROLL_SETTLE_DURATION)
+        gesture.swipe(x1, y1, x2, y2)
+    gesture.perform()
+    page_object._context.invalidate_page_source()
@@ -0,0 +1,137 @@
+import re
+
+__all__ = ['ElementIndex', 'LocalElement']
+
+# attributes of UiAutomator2 (Android) and XCUITest (iOS) hierarchies
+_INDEXED_ATTRS = ('resource-id', 'text', 'content-desc', 'class', 'name', 'label', 'type')
+
+# attribute names accepted by `WebElement.get_attribute` -> those in page source
+_ATTR_ALIASES = {
+    'resourceId': 'resource-id',
+    'contentDescription': 'content-desc',
+    'className': 'class',
+}
+
+_BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+class ElementIndex(object):
+    """Indexes of an Appium XML hierarchy, for answering lookups locally.
+
+    Args:
+        root: The root element of the parsed page source. See
+            `AppContext.get_page_tree`.
+
+    """
+
+    def __init__(self, root):
+        self._root = root
+        self._positions = None # {id(node): position in document order}
+        self._index = dict((attr, {}) for attr in _INDEXED_ATTRS)
+        self._short_ids = {} # {'id' of 'package:id/id': nodes}
+
+        for node in root.iter():
+            for attr in _INDEXED_ATTRS:
+                value = node.get(attr)
+                if value:
+                    self._index[attr].setdefault(value, []).append(node)
+
+            resource_id = node.get('resource-id')
+            if resource_id and ':id/' in resource_id:
+                self._short_ids.setdefault(resource_id.split(':id/', 1)[1], []).append(node)
+
+    def find(self, how, using):
+        """Return nodes matching the locator in document order, or `None` if
+        the strategy is not supported locally (e.g., XPath)."""
+        if how == 'id':
+            if ':id/' in using:
+                return self._lookup(using, 'resource-id')
+            return self._lookup(using, 'resource-id') or \
+                   self._short_ids.get(using, []) or \
+                   self._lookup(using, 'name') # iOS
+        elif how == 'accessibility id':
+            return self._lookup(using, 'content-desc') or self._lookup(using, 'name')
+        elif how == 'name':
+            return self._lookup(using, 'text', 'content-desc', 'name', 'label')
+        elif how == 'class name':
+            return self._lookup(using, 'class', 'type')
+        else:
+            return None
+
+    def _lookup(self, using, *attrs):
+        nodes = []
+        for attr in attrs:
+            nodes.extend(self._index[attr].get(using, []))
+
+        if len(attrs) > 1: # dedupe, and keep document order
+            seen = set()
+            nodes = [n for n in nodes if not (id(n) in seen or seen.add(id(n)))]
+            nodes.sort(key=self._position)
+        return nodes
+
+    def _position(self, node):
+        if self._positions is None:
+            self._positions = dict((id(n), position) for position, n in enumerate(self._root.iter()))
+        return self._positions[id(node)]
+
+class LocalElement(object):
+    """An element found in page source. Existence, attribute and visibility
+    checks are answered locally, while other operations (e.g., `click`) are
+    delegated to a WebElement resolved on demand.
+
+    Args:
+        node: The node in page source.
+        resolve: A callable returning the corresponding WebElement.
+
+    """
+
+    id = None
+
+    def __init__(self, node, resolve):
+        self._node = node
+        self._resolve = resolve
+        self._element = None
+
+    def resolve(self):
+        if self._element is None:
+            self._element = self._resolve()
+        return self._element
+
+    def get_attribute(self, name):
+        return self._node.get(_ATTR_ALIASES.get(name, name))
+
+    @property
+    def text(self):
+        node = self._node
+        return node.get('text') or node.get('label') or node.get('value')
+
+    @property
+    def tag_name(self):
+        return self._node.get('class') or self._node.tag
+
+    def is_displayed(self):
+        displayed = self._node.get('displayed', self._node.get('visible', 'true'))
+        return displayed == 'true'
+
+    @property
+    def location(self):
+        x, y, w, h = self._rect()
+        return {'x': x, 'y': y}
+
+    @property
+    def size(self):
+        x, y, w, h = self._rect()
+        return {'width': w, 'height': h}
+
+    def _rect(self):
+        node = self._node
+        match = _BOUNDS_PATTERN.match(node.get('bounds', ''))
+        if match: # Android
+            x1, y1, x2, y2 = [int(v) for v in match.groups()]
+            return x1, y1, x2 - x1, y2 - y1
+        return tuple(int(node.get(attr, 0)) for attr in ('x', 'y', 'width', 'height'))
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        return '<LocalElement %s %s>' % (self.tag_name, dict(self._node.attrib))
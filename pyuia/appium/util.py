@@ -1,12 +1,23 @@
+import re
 from datetime import datetime
 
-__all__ = ['get_logs']
+__all__ = ['get_logs', 'LogFilter']
 
-def get_logs(driver, log_type):
+def get_logs(driver, log_type, log_filter=None):
+    """Return formatted device logs.
+
+    Args:
+        log_filter: A `LogFilter` to drop irrelevant entries before formatting.
+            Defaults to `None`, i.e., no filtering.
+
+    """
     raw_logs = driver.get_log(log_type)
+    match = log_filter.matcher(log_type) if log_filter else None
 
     logs = []
     for raw_log in raw_logs:
+        if match and not match(raw_log['message']): continue
+
         timestamp_sec = raw_log['timestamp'] / 1000
         time_str = datetime.fromtimestamp(timestamp_sec).strftime('%Y-%m-%d %H:%M:%S')
         log = '%s %s' % (time_str, raw_log['message'])
@@ -14,3 +25,79 @@ def get_logs(driver, log_type):
 
     return logs
 
+_PRIORITIES = 'VDIWEF'
+
+class LogFilter(object):
+    """Criteria of device logs worth keeping, compiled into a regex per log type.
+
+    Criteria of different kinds are ANDed, and values of the same kind are ORed.
+    Entries not in the expected format are dropped, unless no criteria apply.
+
+    Args:
+        packages: Packages (Android) or bundle IDs (iOS) of processes to keep.
+            They are resolved to PIDs by `AppiumContext` whenever the app is
+            opened. See `resolved_pids`.
+        pids: Process IDs to keep.
+        tags: Tags to keep (logcat only).
+        min_priority: The minimum priority to keep, one of 'V', 'D', 'I', 'W',
+            'E' and 'F' (logcat only).
+        processes: Process names to keep (syslog only).
+
+    Example:
+
+        context.log_filter = LogFilter(packages=['com.example.app'], min_priority='I')
+
+    """
+
+    def __init__(self, packages=(), pids=(), tags=(), min_priority=None, processes=()):
+        if min_priority is not None and min_priority not in _PRIORITIES:
+            raise ValueError('Unknown priority: %s. Use one of %s.' % (min_priority, list(_PRIORITIES)))
+
+        self.packages = list(packages)
+        self.pids = [str(pid) for pid in pids]
+        self.tags = list(tags)
+        self.min_priority = min_priority
+        self.processes = list(processes)
+        self._resolved_pids = []
+        self._matchers = {} # {log_type: match}
+
+    @property
+    def resolved_pids(self):
+        """PIDs resolved from `packages`."""
+        return self._resolved_pids
+
+    @resolved_pids.setter
+    def resolved_pids(self, pids):
+        self._resolved_pids = [str(pid) for pid in pids]
+        self._matchers.clear()
+
+    def matcher(self, log_type):
+        """Return a function telling whether a raw message is worth keeping, or
+        `None` if no criteria apply to the log type."""
+        if log_type not in self._matchers:
+            pattern = self._pattern_of(log_type)
+            self._matchers[log_type] = re.compile(pattern).match if pattern else None
+        return self._matchers[log_type]
+
+    def _pattern_of(self, log_type):
+        pids = _any_of(self.pids + self._resolved_pids)
+
+        if log_type == 'logcat':
+            # threadtime format, e.g., '10-18 12:34:56.789  1234  1250 I ActivityManager: ...'
+            priority = '[%s]' % _PRIORITIES[_PRIORITIES.index(self.min_priority):] \
+                       if self.min_priority else None
+            tags = _any_of(self.tags)
+            if not (pids or priority or tags): return None
+            return r'\S+ \S+\s+%s\s+\d+\s+%s\s+%s' % (
+                pids or r'\d+', priority or r'\w', r'%s\s*:' % tags if tags else '')
+
+        elif log_type == 'syslog':
+            # e.g., 'Oct 18 12:34:56 iPhone MyApp(UIKitCore)[1234] <Notice>: ...'
+            processes = _any_of(self.processes)
+            if not (pids or processes): return None
+            return r'\w+\s+\d+ \S+ \S+ %s(?:\([^)]*\))?\[%s\]' % (processes or r'[^\[(]+', pids or r'\d+')
+
+        return None
+
+def _any_of(values):
+    return '(?:%s)' % '|'.join(re.escape(value) for value in values) if values else None
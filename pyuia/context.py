@@ -1,4 +1,5 @@
-import logging
+import hashlib, logging
+from contextlib import contextmanager
 __all__ = ['AppContext']
 
 _logger = logging.getLogger(__name__)
@@ -7,11 +8,69 @@ class AppContext(object):
 
     def __init__(self, platform):
         self.platform = platform
+        self._page_source = None
+        self._page_trees = {}
 
     def dump_page_source(self, page=None):
         raise NotImplementedError()
 
-    def take_screenshot_as_png(self, page=None):
+    def get_page_source(self):
+        """Return page source memoized until `invalidate_page_source` is called,
+        i.e., the UI is (supposed to be) changed."""
+        if self._page_source is None:
+            self._page_source = self.dump_page_source()
+        return self._page_source
+
+    def get_page_tree(self, root=None):
+        """Return memoized parsed (XML) page source.
+
+        Args:
+            root: An ElementTree path to prune the tree to the subtree rooted
+                at the first matching element. Defaults to `None`.
+
+        """
+        if root not in self._page_trees:
+            source, ext = self.get_page_source()
+            if ext != 'xml':
+                raise ValueError('Page source in %s format is not supported.' % ext)
+
+            from .pagesource import parse_page_source
+            self._page_trees[root] = parse_page_source(source, root)
+        return self._page_trees[root]
+
+    def invalidate_page_source(self):
+        self._page_source = None
+        self._page_trees.clear()
+
+    def get_page_digest(self, memoized=False):
+        """Return a digest of the current page source, which changes as the UI changes.
+
+        Args:
+            memoized: Whether to digest the memoized page source (see
+                `get_page_source`) rather than a fresh dump. Defaults to `False`.
+
+        """
+        source, ext = self.get_page_source() if memoized else self.dump_page_source()
+        return hashlib.md5(source.encode('utf-8')).hexdigest()
+
+    @contextmanager
+    def polling(self):
+        """Enter a mode in which lookups fail fast, while pyuia polls the UI by
+        itself. Nested calls are allowed."""
+        yield
+
+    def take_screenshot_as_png(self, element=None, region=None, scale=None):
+        """Take a screenshot of the screen, an element or a region.
+
+        Args:
+            element: The element to capture, or a locator resolved right before
+                capturing. Defaults to `None`, i.e., the whole screen.
+            region: The region (x, y, width, height) to capture, in the same
+                unit as element locations. Defaults to `None`.
+            scale: The factor to downscale the screenshot by, e.g., 0.5.
+                Defaults to `None`, i.e., the device resolution.
+
+        """
         raise NotImplementedError()
 
     def log_screenshot(self, msg, *args, **kwargs):
@@ -32,6 +91,10 @@ class AppContext(object):
         level = kwargs['level'] if 'level' in kwargs else logging.DEBUG
         _logger.log(level, msg)
 
+    def open_shortcut(self, shortcut):
+        """Bring the app to a page directly. See `PageObject._SHORTCUT`."""
+        raise NotImplementedError()
+
     def get_initial_logs(self):
         raise NotImplementedError()
 
@@ -51,6 +114,10 @@ class AppContext(object):
         """Close the app."""
         raise NotImplementedError()
 
+    def is_alive(self):
+        """Whether the session is still healthy and can be reused."""
+        raise NotImplementedError()
+
     def quit(self):
         """Terminate the session."""
         raise NotImplementedError()
@@ -0,0 +1,84 @@
+import heapq, logging
+
+__all__ = ['NavigationGraph', 'navigation']
+_logger = logging.getLogger(__name__)
+
+def _fqcn(page_class):
+    return '%s.%s' % (page_class.__module__, page_class.__name__)
+
+class NavigationGraph(object):
+    """Page transitions observed so far, and the time they take.
+
+    A transition is recorded along with the (no-argument) method of the page
+    object that triggers it, so that it can be replayed to route from page to
+    page. Pages with a `_SHORTCUT` (e.g., a deep link) can be reached from
+    anywhere. Time is smoothed with an exponential moving average.
+
+    Args:
+        smoothing: The weight of the latest measurement. Defaults to 0.3.
+
+    """
+
+    def __init__(self, smoothing=0.3):
+        self._smoothing = smoothing
+        self._edges = {} # {from_fqcn: {method_name: [to_fqcn, seconds]}}
+        self._shortcuts = {} # {fqcn: seconds}
+        self._classes = {} # {fqcn: page_class}
+
+    def record(self, from_class, method_name, to_class, seconds):
+        self._classes[_fqcn(from_class)] = from_class
+        self._classes[_fqcn(to_class)] = to_class
+
+        edges = self._edges.setdefault(_fqcn(from_class), {})
+        edge = edges.get(method_name)
+        if edge and edge[0] == _fqcn(to_class):
+            edge[1] = self._smooth(edge[1], seconds)
+        else: # the method leads elsewhere now
+            edges[method_name] = [_fqcn(to_class), seconds]
+
+    def record_shortcut(self, page_class, seconds):
+        fqcn = _fqcn(page_class)
+        self._classes[fqcn] = page_class
+        self._shortcuts[fqcn] = self._smooth(self._shortcuts[fqcn], seconds) \
+                                if fqcn in self._shortcuts else seconds
+
+    def _smooth(self, average, seconds):
+        return average + self._smoothing * (seconds - average)
+
+    def route(self, from_class, to_class):
+        """Return the cheapest known route as a list of (method_name, page_class),
+        where `method_name` is `None` for taking the shortcut to the page, or
+        `None` if the page is unreachable."""
+        source, target = _fqcn(from_class), _fqcn(to_class)
+        self._classes.setdefault(target, to_class)
+
+        # shortcuts never taken are assumed to be free, so they are tried once at least.
+        queue = [(0, source, None, None)]
+        for fqcn, page_class in self._classes.items():
+            if fqcn != source and getattr(page_class, '_SHORTCUT', None):
+                queue.append((self._shortcuts.get(fqcn, 0), fqcn, None, None))
+        heapq.heapify(queue)
+
+        previous = {} # {fqcn: (from_fqcn, method_name)}, Dijkstra's algorithm
+        while queue:
+            cost, fqcn, from_fqcn, method_name = heapq.heappop(queue)
+            if fqcn in previous: continue
+            previous[fqcn] = (from_fqcn, method_name)
+            if fqcn == target: break
+
+            for name, (to_fqcn, seconds) in self._edges.get(fqcn, {}).items():
+                if to_fqcn not in previous:
+                    heapq.heappush(queue, (cost + seconds, to_fqcn, fqcn, name))
+
+        if target not in previous: return None
+
+        route, fqcn = [], target
+        while fqcn != source:
+            from_fqcn, method_name = previous[fqcn]
+            route.append((method_name, self._classes.get(fqcn)))
+            if from_fqcn is None: break # shortcut
+            fqcn = from_fqcn
+        route.reverse()
+        return route
+
+navigation = NavigationGraph() # used by page objects by default
@@ -1,7 +1,10 @@
-import time, logging
+import sys, time, logging, threading
+from contextlib import contextmanager
 from .exceptions import TimeoutError, ElementNotFoundError
+from .timing import timings
+from .navigation import navigation
 
-__all__ = ['PageObject', 'get_page_object', 'cacheable']
+__all__ = ['PageObject', 'get_page_object', 'clear_page_objects', 'cacheable']
 _logger = logging.getLogger(__name__)
 
 _page_singletons = {} # cache
@@ -23,6 +26,12 @@ def get_page_object(page_class, context):
     _page_singletons[fqcn] = page
     return page
 
+def clear_page_objects(context=None):
+    """Discard cached page objects (of the context), e.g., when the session ends."""
+    for fqcn, page in _page_singletons.items():
+        if context is None or page._context is context:
+            del _page_singletons[fqcn]
+
 def _is_iterable(obj):
     try:
        iter(obj)
@@ -34,6 +43,14 @@ def _to_iterable(obj):
     return obj if _is_iterable(obj) else (obj,)
 
 _NOT_FOUND_EXCEPTIONS = (ElementNotFoundError,)
+_exception_tuples = {} # {not_found_exceptions: (not found, page assertion)}, shared by page objects
+
+def _get_exception_tuples(not_found_exceptions):
+    key = tuple(_to_iterable(not_found_exceptions or ()))
+    if key not in _exception_tuples:
+        exceptions = _NOT_FOUND_EXCEPTIONS + key
+        _exception_tuples[key] = (exceptions, exceptions + (AssertionError,))
+    return _exception_tuples[key]
 
 _ELEMENTS_CACHE_ATTR = '_pyuia_elements_cache'
 
@@ -47,42 +64,248 @@ def cacheable(lookup, cache_none=True):
         if key not in cache:
             result = lookup(self)
             if result is None and not cache_none: return
-            cache[key] = result
+            if len(cache) >= self._ELEMENTS_CACHE_SIZE: # bounded; evict an arbitrary entry
+                del cache[next(iter(cache))]
+            cache[key] = self._wrap_cached(lookup, result)
         return cache[key]
 
+    def invalidate(self):
+        """Drop the cached result, e.g., when the element has gone stale."""
+        if hasattr(self, _ELEMENTS_CACHE_ATTR):
+            getattr(self, _ELEMENTS_CACHE_ATTR).pop(id(lookup), None)
+
+    func.invalidate = invalidate
+    func._pyuia_lookup, func._pyuia_cache_none = lookup, cache_none # see `PageObject._prefetch`
     return func
 
+class _StabilityDetector(object):
+    """Consider the UI stable after a number of successive polls resulting
+    in the same page digest."""
+
+    def __init__(self, context, polls):
+        self._context = context
+        self._polls = polls
+        self.supported = True
+        self.reset()
+
+    def reset(self):
+        self._digest, self._same = None, 0
+
+    def poll(self):
+        if not self.supported: return False
+
+        try:
+            digest = self._context.get_page_digest()
+        except NotImplementedError:
+            _logger.debug('Page digest is not supported by the context.')
+            self.supported = False
+            return False
+        except Exception: # e.g., page source unavailable during transitions
+            _logger.debug('Fail to get the page digest. Consider the UI not stable yet.', exc_info=True)
+            self.reset()
+            return False
+
+        if digest == self._digest:
+            self._same += 1
+        else:
+            self._digest, self._same = digest, 1
+        return self._same >= self._polls
+
+_warn_captures = 0 # screenshots taken for slow waits so far, see `PageObject._MAX_WARN_CAPTURES`
+
+def _reserve_warn_capture(limit):
+    global _warn_captures
+    if limit is not None and _warn_captures >= limit: return False
+    _warn_captures += 1
+    return True
+
+class _WarnCapture(object):
+    """Capture the UI once a wait takes longer than expected, according to
+    `PageObject._WARN_CAPTURE`. Call it to warn, and it takes effect only once."""
+
+    _JOIN_TIMEOUT = 10 # seconds to wait for a screenshot taken in the background
+
+    def __init__(self, page):
+        self._page = page
+        self._mode = page._WARN_CAPTURE
+        self._msg = None
+        self._thread = self._png = None
+        self.element = None # the element (or locator) the wait is targeting, if any
+
+    def __enter__(self):
+        return self
+
+    def __call__(self, msg, *args):
+        if self._msg is not None: return
+        self._msg = msg % args
+        page, mode = self._page, self._mode
+
+        if mode == 'immediate' and _reserve_warn_capture(page._MAX_WARN_CAPTURES):
+            page._log_screenshot('%s', self._msg, level=logging.WARN, **self._options())
+        elif mode == 'digest':
+            try:
+                digest = page._context.get_page_digest(memoized=True)
+            except NotImplementedError:
+                digest = None
+            except Exception: # e.g., page source unavailable during transitions
+                _logger.debug('Fail to get the page digest for the slow wait.', exc_info=True)
+                digest = None
+            _logger.warning('%s Page digest = [%s].', self._msg, digest)
+        else:
+            _logger.warning('%s', self._msg)
+            if mode == 'background' and _reserve_warn_capture(page._MAX_WARN_CAPTURES):
+                self._thread = threading.Thread(target=self._take_screenshot)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _options(self):
+        options = self._page._screenshot_options()
+        if self.element is not None:
+            options['element'] = self.element
+        return options
+
+    def _take_screenshot(self):
+        try:
+            self._png = self._page._context.take_screenshot_as_png(**self._options())
+        except Exception:
+            _logger.debug('Fail to take the screenshot in the background.', exc_info=True)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._msg is None: return False
+        page = self._page
+
+        # never mask the outcome of the wait
+        try:
+            if self._thread:
+                self._thread.join(self._JOIN_TIMEOUT)
+                if self._png:
+                    page._log_screenshot('%s', self._msg, png=self._png, level=logging.WARN)
+            elif self._mode == 'deferred' and exc_type and \
+                    _reserve_warn_capture(page._MAX_WARN_CAPTURES):
+                page._log_screenshot('%s (failed)', self._msg, level=logging.WARN, **self._options())
+        except Exception:
+            _logger.debug('Fail to capture the UI for the slow wait.', exc_info=True)
+        return False
+
+@contextmanager
+def _untimed():
+    yield
+
+def _polling(method):
+    """Decorate methods polling the UI, which are timed as waits. Lookups fail
+    fast meanwhile (see `AppContext.polling`). See `PageObject._start_poll`."""
+    def wrapper(self, *args, **kwargs):
+        try:
+            with self._timed('wait', '%s.%s' % (self.__class__.__name__, method.__name__)):
+                with self._context.polling():
+                    return method(self, *args, **kwargs)
+        finally:
+            self._poll_cache = None
+
+    wrapper.__name__, wrapper.__doc__ = method.__name__, method.__doc__
+    return wrapper
+
+def _probing(method):
+    """Decorate methods probing the UI for elements that may well be absent,
+    during which lookups fail fast. See `AppContext.polling`."""
+    def wrapper(self, *args, **kwargs):
+        with self._context.polling():
+            return method(self, *args, **kwargs)
+
+    wrapper.__name__, wrapper.__doc__ = method.__name__, method.__doc__
+    return wrapper
+
 class PageObject(object):
 
+    # subclasses may declare `__slots__ = ()` as well to get rid of per-instance __dict__.
+    __slots__ = ('_context', '_from_page_class', '_not_found_exceptions',
+                 '_page_assertion_exceptions', '_stale_exceptions', '_poll_cache',
+                 _ELEMENTS_CACHE_ATTR, '__weakref__')
+
     _WAIT_INTERVAL = 0
     _WARN_TIMEOUT = 5
     _WAIT_TIMEOUT = 10
     _PAGE_WARN_TIMEOUT = 5
     _PAGE_WAIT_TIMEOUT = 10
-    
-    def __init__(self, context, not_found_exceptions):
-        self._context = context
-
-        exceptions = list(_NOT_FOUND_EXCEPTIONS)
-        if not_found_exceptions:
-            try:
-                exceptions.extend(not_found_exceptions)
-            except TypeError: # not iterable
-                exceptions.append(not_found_exceptions)
-        self._not_found_exceptions = tuple(exceptions)
 
-        exceptions.append(AssertionError)
-        self._page_assertion_exceptions = tuple(exceptions)
+    # hit/miss statistics of locators (`LocatorStats`), and whether any-of
+    # checks try locators in descending order of hit rate.
+    _LOCATOR_STATS = None
+    _REORDER_LOCATORS = False
+
+    # the UI is considered stable after a number of successive polls of the
+    # same page source, or after _MIN_WAIT seconds anyway.
+    _STABLE_POLLS = 2
+    _MIN_WAIT = 3
+    _WAIT_STABLE_ON_ENTRY = False
+
+    # how to capture the UI once a wait exceeds its `timeout_warn`:
+    # - 'deferred': log a warning, and take a screenshot only if the wait fails.
+    # - 'background': log a warning, take a screenshot in another thread, and
+    #   log it once the wait ends. The driver must tolerate concurrent requests.
+    # - 'immediate': take a screenshot right away, delaying the wait.
+    # - 'digest': log a warning with a digest of the page source.
+    # - 'none': log a warning only.
+    # At most _MAX_WARN_CAPTURES screenshots (or `None` for no limit) are
+    # taken per run.
+    _WARN_CAPTURE = 'deferred'
+    _MAX_WARN_CAPTURES = 20
+
+    # screenshots cover the element of the named locator (e.g., the root
+    # container of the page) rather than the whole screen, and are downscaled
+    # by _SCREENSHOT_SCALE (e.g., 0.5), if specified.
+    _CAPTURE_ROOT = None
+    _SCREENSHOT_SCALE = None
+
+    # the maximum number of entries in the elements cache (see `cacheable`)
+    _ELEMENTS_CACHE_SIZE = 64
+
+    # names of (cacheable) locators resolved into the elements cache once the
+    # page is loaded, either in another thread ('background') while the test
+    # goes on, or right away ('sync'). The driver must tolerate concurrent
+    # requests for the former.
+    _PREFETCH = ()
+    _PREFETCH_MODE = 'background'
+
+    # a `TimingRecorder` for page transitions, waits, handlers and page entry,
+    # or `None` to disable timing.
+    _TIMINGS = timings
+
+    # a `NavigationGraph` learning page transitions for `navigate_to`, or
+    # `None` to disable it.
+    _NAVIGATION = navigation
+
+    # how to bring the app to this page directly, e.g., a deep link or an
+    # Android activity as (package, activity). See `AppContext.open_shortcut`.
+    _SHORTCUT = None
+
+    def __init__(self, context, not_found_exceptions, stale_exceptions=None):
+        """
+        Args:
+            not_found_exceptions: Exception(s) indicating an element is not found.
+            stale_exceptions: Exception(s) indicating an element has gone stale,
+                e.g., removed from the UI. A stale element is re-resolved once
+                if it comes from the elements cache.
+
+        """
+        self._context = context
+        self._not_found_exceptions, self._page_assertion_exceptions = \
+            _get_exception_tuples(not_found_exceptions)
+        self._stale_exceptions = tuple(_to_iterable(stale_exceptions or ()))
 
     def _go_to(self, page_class):
         """Instantiate a page object."""
         page = get_page_object(page_class, self._context)
         page._from_page_class = self.__class__
 
-        page.wait_for_page_loaded(self.__class__)
+        start_time = time.time()
+        with self._timed_transition(page_class):
+            page.wait_for_page_loaded(self.__class__)
+        self._record_transition(sys._getframe(1), page_class, time.time() - start_time)
         return page
 
     def _back_to(self, page_class=None):
+        replayable = page_class is not None # the destination varies otherwise
         if not page_class:
             if not hasattr(self, '_from_page_class'):
                 raise RuntimeError("_back_to(page_class) don't know where to go. You can explicitly specify "
@@ -90,14 +313,94 @@ class PageObject(object):
             page_class = self._from_page_class
         page = get_page_object(page_class, self._context)
 
-        page.wait_for_page_loaded(self.__class__)
+        start_time = time.time()
+        with self._timed_transition(page_class):
+            page.wait_for_page_loaded(self.__class__)
+        if replayable:
+            self._record_transition(sys._getframe(1), page_class, time.time() - start_time)
+        return page
+
+    def _record_transition(self, frame, page_class, seconds):
+        """Record the transition made by the calling method, if it can be
+        replayed, i.e., it is a method of this page taking no arguments."""
+        if not self._NAVIGATION: return
+
+        code = frame.f_code
+        method = getattr(self.__class__, code.co_name, None)
+        if getattr(method, '__func__', None) is None or method.__func__.__code__ is not code \
+                or code.co_argcount != 1:
+            return
+        self._NAVIGATION.record(self.__class__, code.co_name, page_class, seconds)
+
+    def navigate_to(self, page_class):
+        """Go to the page by the cheapest known route, replaying transitions
+        learned so far (see `_NAVIGATION`) and taking shortcuts (see `_SHORTCUT`).
+
+        Returns: The page object.
+
+        """
+        if self.__class__ is page_class: return self
+
+        route = self._NAVIGATION.route(self.__class__, page_class) if self._NAVIGATION else None
+        if route is None:
+            raise RuntimeError('No known route from %s to %s.' % (self.__class__.__name__, page_class.__name__))
+        _logger.debug('Navigate to %s; route = %s.', page_class.__name__,
+                      [(name or 'shortcut', cls.__name__) for name, cls in route])
+
+        page = self
+        for method_name, next_class in route:
+            if method_name is None:
+                page = page._take_shortcut(next_class)
+            else:
+                page = getattr(page, method_name)()
+            if page.__class__ is not next_class:
+                raise RuntimeError('%s leads to %s rather than %s.' % (
+                    method_name or 'The shortcut', page.__class__.__name__, next_class.__name__))
+        return page
+
+    def _take_shortcut(self, page_class):
+        page = get_page_object(page_class, self._context)
+
+        start_time = time.time()
+        with self._timed_transition(page_class):
+            self._context.open_shortcut(page_class._SHORTCUT)
+            page.wait_for_page_loaded()
+        if self._NAVIGATION:
+            self._NAVIGATION.record_shortcut(page_class, time.time() - start_time)
         return page
 
+    def _timed(self, category, name):
+        return self._TIMINGS.timed(category, name) if self._TIMINGS else _untimed()
+
+    def _timed_transition(self, page_class):
+        return self._timed('transition', '%s -> %s' % (self.__class__.__name__, page_class.__name__))
+
     def _invalidate_elements_cache(self):
         if hasattr(self, _ELEMENTS_CACHE_ATTR):
             delattr(self, _ELEMENTS_CACHE_ATTR)
+        self._context.invalidate_page_source()
 
     def wait_for_page_loaded(self, from_page_class=None, timeout_warn=None, timeout=None):
+        self._wait_for_page_loaded(from_page_class, timeout_warn, timeout)
+
+        self._log_screenshot('Already on the page.')
+        if self._WAIT_STABLE_ON_ENTRY:
+            self._wait_stable()
+
+        # return True to indicate UI changed.
+        with self._timed('page_entry', self.__class__.__name__):
+            changed = self._on_page_entry(from_page_class)
+        if changed:
+            self._invalidate_elements_cache()
+            self._log_screenshot('Page loaded.')
+
+        # prefetch only once the page settles, so nothing resolved is outdated.
+        self._prefetch()
+        return self
+
+    @_polling
+    def _wait_for_page_loaded(self, from_page_class, timeout_warn, timeout):
+        """Poll until `assert_on_this_page` passes. Page entry is not part of it."""
         timeout_warn = timeout_warn or self._PAGE_WARN_TIMEOUT
         timeout = timeout or self._PAGE_WAIT_TIMEOUT
 
@@ -106,31 +409,61 @@ class PageObject(object):
         timeout = start_time + timeout
         handlers = self._get_page_entry_handlers(from_page_class)
 
-        warned = False
-        while True:
-            try:
-                self._invalidate_elements_cache()
-                self.assert_on_this_page(from_page_class)
-                break
-            except self._page_assertion_exceptions:
-                if not warned and time.time() > timeout_warn:
-                    self._log_screenshot(
-                        'Wait for page loaded. Time elapsed = [%s]s.',
-                        time.time() - start_time,
-                        level=logging.WARN)
-                    warned = True
+        with _WarnCapture(self) as warn:
+            while True:
+                try:
+                    self._invalidate_elements_cache()
+                    self._start_poll()
+                    self.assert_on_this_page(from_page_class)
+                    break
+                except self._page_assertion_exceptions:
+                    if time.time() > timeout_warn:
+                        warn('Wait for page loaded. Time elapsed = [%s]s.', time.time() - start_time)
 
-                handlers = self._consult_handlers(handlers)
-                time.sleep(self._WAIT_INTERVAL)
-                if time.time() > timeout: raise
+                    handlers = self._consult_handlers(handlers)
+                    time.sleep(self._WAIT_INTERVAL)
+                    if time.time() > timeout: raise
 
-        self._log_screenshot('Already on the page.')
+    def _prefetch(self):
+        """Resolve locators named in `_PREFETCH` into the elements cache."""
+        if not self._PREFETCH: return
 
-        # return True to indicate UI changed.
-        if self._on_page_entry(from_page_class):
-            self._log_screenshot('Page loaded.')
+        # fill the cache as of now, which is simply discarded once invalidated.
+        if not hasattr(self, _ELEMENTS_CACHE_ATTR):
+            setattr(self, _ELEMENTS_CACHE_ATTR, {})
+        cache = getattr(self, _ELEMENTS_CACHE_ATTR)
 
-        return self
+        lookups = []
+        for name in self._PREFETCH:
+            locator = getattr(self.__class__, name)
+            if not hasattr(locator, '_pyuia_lookup'):
+                raise ValueError('The locator (%s) is not cacheable, and cannot be prefetched.' % name)
+            if id(locator._pyuia_lookup) not in cache: # resolved while asserting on the page
+                lookups.append((locator._pyuia_lookup, locator._pyuia_cache_none))
+        if not lookups: return
+
+        if self._PREFETCH_MODE == 'background':
+            thread = threading.Thread(target=self._fill_elements_cache, args=(cache, lookups))
+            thread.daemon = True
+            thread.start()
+        else:
+            self._fill_elements_cache(cache, lookups)
+
+    def _fill_elements_cache(self, cache, lookups):
+        for lookup, cache_none in lookups:
+            if len(cache) >= self._ELEMENTS_CACHE_SIZE: break
+            try:
+                # never enter `AppContext.polling` (see `if_exists` lookups) off the main
+                # thread, where it would change how lookups of the session behave.
+                result = getattr(lookup, '_pyuia_unprobed', lookup)(self)
+            except self._not_found_exceptions:
+                continue
+            except Exception: # prefetching is the best effort
+                _logger.debug('Fail to prefetch the locator (%s).', lookup, exc_info=True)
+                continue
+
+            if result is None and not cache_none: continue
+            cache.setdefault(id(lookup), self._wrap_cached(lookup, result))
 
     def _get_page_entry_handlers(self, from_page_class): pass
 
@@ -140,14 +473,89 @@ class PageObject(object):
         """To put the page in a known state."""
         pass
 
+    def _start_poll(self):
+        """Start a poll, during which the UI is assumed unchanged, so that locators
+        shared by other locators are resolved only once. See `_resolve_shared`."""
+        self._context.invalidate_page_source()
+        self._poll_cache = {}
+
+    def _ui_changed(self):
+        """Discard what is assumed unchanged within the current poll."""
+        self._context.invalidate_page_source()
+        if getattr(self, '_poll_cache', None) is not None:
+            self._poll_cache = {}
+
+    def _resolve_shared(self, locator):
+        """Resolve a locator shared by other locators, e.g., the `context` of
+        `find_by`. The result (or error) is reused within a poll."""
+        cache = getattr(self, '_poll_cache', None)
+        if cache is None: return locator(self)
+
+        key = id(locator)
+        if key not in cache:
+            try:
+                cache[key] = (locator(self), None)
+            except self._not_found_exceptions as e:
+                cache[key] = (None, e)
+
+        result, error = cache[key]
+        if error: raise error
+        return result
+
+    def _forget_shared(self, locator):
+        cache = getattr(self, '_poll_cache', None)
+        if cache: cache.pop(id(locator), None)
+
+    def _wrap_cached(self, lookup, result):
+        """Return what to keep in the elements cache for the result of the
+        lookup, e.g., an element that re-resolves itself once it has gone stale."""
+        return result
+
+    def _invalidate_element(self, locator):
+        """Drop the cached result of the locator. Returns `False` if it is not cacheable."""
+        invalidate = getattr(locator, 'invalidate', None)
+        if not invalidate: return False
+
+        invalidate(self)
+        return True
+
+    def _displayed_element(self, locator, element):
+        """Return the element resolved from the locator if it is displayed, or
+        `None`. If the element has gone stale, the locator is resolved again."""
+        try:
+            return element if self._is_displayed(element) else None
+        except self._stale_exceptions: # e.g., raised by an overriding `_is_displayed`
+            if not self._invalidate_element(locator): return None
+
+        _logger.debug('The element of the locator (%s) is stale. Re-resolve it.', locator)
+        try:
+            element = locator()
+        except self._not_found_exceptions:
+            return None
+        return element if element and self._is_displayed(element) else None
+
     def _log_screenshot(self, msg, *args, **kwargs):
         kwargs['page'] = self
-        self._context.log_screenshot(msg, *args, **kwargs)
+        options = self._screenshot_options()
+        if 'region' in kwargs: options.pop('element', None)
+        options.update(kwargs) # explicit options take precedence
+        self._context.log_screenshot(msg, *args, **options)
+
+    def _screenshot_options(self):
+        """Return options of `AppContext.take_screenshot_as_png` as specified by
+        `_CAPTURE_ROOT` and `_SCREENSHOT_SCALE`."""
+        options = {}
+        if self._CAPTURE_ROOT:
+            options['element'] = getattr(self, self._CAPTURE_ROOT) # resolved when capturing
+        if self._SCREENSHOT_SCALE:
+            options['scale'] = self._SCREENSHOT_SCALE
+        return options
 
     def _log_page_source(self, msg, *args, **kwargs):
         kwargs['page'] = self
         self._context.log_page_source(msg, *args, **kwargs)
 
+    @_probing
     def _assert_present(self, locators, check_visibility=False):
         single_loc = not _is_iterable(locators)
         locators = _to_iterable(locators)
@@ -164,8 +572,9 @@ class PageObject(object):
             if not element:
                 assert False, locator # None or empty sequence
 
-            if check_visibility and not self._is_displayed(element):
-                assert False, locator
+            if check_visibility:
+                element = self._displayed_element(locator, element)
+                if not element: assert False, locator
             elements.append(element)
 
         return elements[0] if single_loc else elements
@@ -173,10 +582,24 @@ class PageObject(object):
     def _assert_visible(self, locators):
         return self._assert_present(locators, check_visibility=True)
 
+    def _order_locators(self, locators):
+        """Return (key, locator) pairs in the order any-of checks try them."""
+        stats = self._LOCATOR_STATS
+        if not stats:
+            return [(None, locator) for locator in locators]
+
+        keyed = [(stats.key_of(locator), locator) for locator in locators]
+        return stats.sort(keyed) if self._REORDER_LOCATORS else keyed
+
+    def _record_locator(self, key, hit):
+        if key is not None:
+            self._LOCATOR_STATS.record(key, hit)
+
+    @_probing
     def _assert_any_present(self, locators, check_visibility=False):
         locators = _to_iterable(locators)
 
-        for locator in locators:
+        for key, locator in self._order_locators(locators):
             try:
                 element = locator()
             except self._not_found_exceptions as e:
@@ -184,9 +607,13 @@ class PageObject(object):
                     'Assert ANY present. The locator (%s) did not resolve to '
                     'an element.', locator)
                 element = None
-            if not element: continue # None or empty sequence
+            if element and check_visibility:
+                element = self._displayed_element(locator, element)
+            if not element:
+                self._record_locator(key, False)
+                continue # None or empty sequence
 
-            if check_visibility and not self._is_displayed(element): continue
+            self._record_locator(key, True)
             return element
 
         assert False, locators
@@ -194,6 +621,7 @@ class PageObject(object):
     def _assert_any_visible(self, locators):
         return self._assert_any_present(locators, check_visibility=True)
 
+    @_polling
     def _wait_present(self, locators, timeout_warn=None, handlers=None,
                       timeout=None, check_visibility=False):
         timeout_warn = timeout_warn or self._WARN_TIMEOUT
@@ -205,44 +633,45 @@ class PageObject(object):
         single_loc = not _is_iterable(locators)
         locators = _to_iterable(locators)
 
-        warned = False
-        while True:
-            elements = []
-            for locator in locators:
-                try:
-                    element = locator()
-                except self._not_found_exceptions as e:
-                    _logger.debug(
-                        'Wait ALL present. The locator (%s) did not resolve to '
-                        'an element.', locator)
-                    element = None
-                if not element: break # None or empty sequence
-
-                if check_visibility and not self._is_displayed(element): break
-                elements.append(element)
-
-            if len(elements) == len(locators):
-                return elements[0] if single_loc else elements
-
-            if not warned and time.time() > timeout_warn:
-                self._log_screenshot(
-                    'Wait ALL elements to be present. locators = %s, '
-                    'check_visibility = [%s], time elapsed = [%s]s.',
-                    locators, check_visibility, time.time() - start_time,
-                    level=logging.WARN)
-                warned = True
-            handlers = self._consult_handlers(handlers)
+        with _WarnCapture(self) as warn:
+            while True:
+                self._start_poll()
+                elements = []
+                for locator in locators:
+                    try:
+                        element = locator()
+                    except self._not_found_exceptions as e:
+                        _logger.debug(
+                            'Wait ALL present. The locator (%s) did not resolve to '
+                            'an element.', locator)
+                        element = None
+                    if not element: break # None or empty sequence
+
+                    if check_visibility:
+                        element = self._displayed_element(locator, element)
+                        if not element: break
+                    elements.append(element)
+
+                if len(elements) == len(locators):
+                    return elements[0] if single_loc else elements
+
+                if time.time() > timeout_warn:
+                    warn('Wait ALL elements to be present. locators = %s, '
+                         'check_visibility = [%s], time elapsed = [%s]s.',
+                         locators, check_visibility, time.time() - start_time)
+                handlers = self._consult_handlers(handlers)
 
-            time.sleep(self._WAIT_INTERVAL)
-            if time.time() > timeout:
-                raise TimeoutError(
-                    'Wait ALL elements to be present. locators = %s, '
-                    'check_visibility = [%s], time elapsed = [%s]s.' %
-                    (locators, check_visibility, time.time() - start_time))
+                time.sleep(self._WAIT_INTERVAL)
+                if time.time() > timeout:
+                    raise TimeoutError(
+                        'Wait ALL elements to be present. locators = %s, '
+                        'check_visibility = [%s], time elapsed = [%s]s.' %
+                        (locators, check_visibility, time.time() - start_time))
 
     def _wait_visible(self, locators, timeout_warn=None, handlers=None, timeout=None):
         return self._wait_present(locators, timeout_warn, handlers, timeout, check_visibility=True)
 
+    @_polling
     def _wait_any_present(self, locators, timeout_warn=None, handlers=None,
                           timeout=None, check_visibility=False):
         timeout_warn = timeout_warn or self._WARN_TIMEOUT
@@ -253,105 +682,145 @@ class PageObject(object):
         timeout = start_time + timeout
         locators = _to_iterable(locators)
 
-        warned = False
-        while True:
-            for locator in locators:
-                try:
-                    element = locator()
-                except self._not_found_exceptions as e:
-                    _logger.debug(
-                        'Wait ANY present. The locator (%s) did not resolve to '
-                        'an element.', locator)
-                    element = None
-                if not element: continue # None or empty sequence
-
-                if check_visibility and not self._is_displayed(element): continue
-                return element
-
-            if not warned and time.time() > timeout_warn:
-                self._log_screenshot(
-                    'Wait ANY present. locators = %s, time elapsed = [%s]s.',
-                    locators, time.time() - start_time, level=logging.WARN)
-                warned = True
-            handlers = self._consult_handlers(handlers)
+        with _WarnCapture(self) as warn:
+            while True:
+                self._start_poll()
+                for key, locator in self._order_locators(locators):
+                    try:
+                        element = locator()
+                    except self._not_found_exceptions as e:
+                        _logger.debug(
+                            'Wait ANY present. The locator (%s) did not resolve to '
+                            'an element.', locator)
+                        element = None
+                    if element and check_visibility:
+                        element = self._displayed_element(locator, element)
+                    if not element:
+                        self._record_locator(key, False)
+                        continue # None or empty sequence
+
+                    self._record_locator(key, True)
+                    return element
+
+                if time.time() > timeout_warn:
+                    warn('Wait ANY present. locators = %s, time elapsed = [%s]s.',
+                         locators, time.time() - start_time)
+                handlers = self._consult_handlers(handlers)
 
-            time.sleep(self._WAIT_INTERVAL)
-            if time.time() > timeout:
-                raise TimeoutError(
-                    'Wait ANY elements to be present. locators = %s, '
-                    'check_visibility = [%s], time elapsed = [%s]s.' %
-                    (locators, check_visibility, time.time() - start_time))
+                time.sleep(self._WAIT_INTERVAL)
+                if time.time() > timeout:
+                    raise TimeoutError(
+                        'Wait ANY elements to be present. locators = %s, '
+                        'check_visibility = [%s], time elapsed = [%s]s.' %
+                        (locators, check_visibility, time.time() - start_time))
 
     def _wait_any_visible(self, locators, timeout_warn=None, handlers=None,
                           timeout=None):
         return self._wait_any_present(locators, timeout_warn, handlers, timeout, check_visibility=True)
 
-    def _wait_absent(self, locators, timeout_warn=None, minwait=3,
+    def _wait_stable(self, polls=None, timeout=None):
+        """Wait for the UI to be stable, i.e., the page source remains unchanged.
+
+        Returns: `False` if the UI is still changing after `timeout` (defaults
+            to `_MIN_WAIT`) seconds.
+
+        """
+        polls = polls or self._STABLE_POLLS
+        timeout = time.time() + (timeout or self._MIN_WAIT)
+        detector = _StabilityDetector(self._context, polls)
+
+        while not detector.poll():
+            if not detector.supported or time.time() > timeout:
+                _logger.debug('The UI is not stable after %s polls.', polls)
+                return False
+            time.sleep(self._WAIT_INTERVAL)
+        return True
+
+    @_polling
+    def _wait_absent(self, locators, timeout_warn=None, minwait=None,
                      handlers=None, timeout=None, check_visibility_only=False):
+        """Wait for all elements to be absent.
+
+        If `minwait` is not specified, the elements are considered absent once
+        the UI is stable (see `_STABLE_POLLS`), or `_MIN_WAIT` seconds elapsed,
+        whichever comes first. Otherwise, wait for at least `minwait` seconds.
+
+        """
         timeout_warn = timeout_warn or self._WARN_TIMEOUT
         timeout = timeout or self._WAIT_TIMEOUT
 
         start_time = time.time()
-        timeout_appear = start_time + minwait
+        detector = _StabilityDetector(self._context, self._STABLE_POLLS) if minwait is None else None
+        timeout_appear = start_time + (self._MIN_WAIT if minwait is None else minwait)
         timeout_warn = start_time + timeout_warn
         timeout = start_time + timeout
         locators = _to_iterable(locators)
 
-        warned = False
-        while True:
-            # to avoid the situation that elements are absent simply because
-            # other elements such as error dialogs are displayed.
-            handlers = self._consult_handlers(handlers)
-            any_invalid = False
-            for locator in locators:
-                try:
-                    element = locator()
-                except self._not_found_exceptions as e:
-                    _logger.debug(
-                        'Wait ALL absent. The locator (%s) did not resolve to '
-                        'an element.', locator)
-                    element = None
-                if not element: continue
-
-                if not check_visibility_only or self._is_displayed(element):
-                    any_invalid = True
-                    break
-
-            # wait for at least 'minwait' seconds to make sure target
-            # element(s) won't appear at this time.
-            if not any_invalid and time.time() > timeout_appear: return
-            if not warned and time.time() > timeout_warn:
-                self._log_screenshot(
-                    'Wait ALL elements to be absent. locators = %s, '
-                    'check_visibility_only = [%s], time elapsed = [%s]s.',
-                    locators, check_visibility_only, time.time() - start_time, 
-                    level=logging.WARN)
-                warned = True
+        with _WarnCapture(self) as warn:
+            while True:
+                # to avoid the situation that elements are absent simply because
+                # other elements such as error dialogs are displayed.
+                self._start_poll()
+                handlers = self._consult_handlers(handlers)
+                any_invalid = False
+                for locator in locators:
+                    try:
+                        element = locator()
+                    except self._not_found_exceptions as e:
+                        _logger.debug(
+                            'Wait ALL absent. The locator (%s) did not resolve to '
+                            'an element.', locator)
+                        element = None
+                    if not element: continue
+
+                    if not check_visibility_only or self._displayed_element(locator, element):
+                        any_invalid = True
+                        break
+
+                # wait for at least 'minwait' seconds (or until the UI is stable)
+                # to make sure target element(s) won't appear at this time.
+                if any_invalid:
+                    warn.element = locator # still there
+                    if detector: detector.reset()
+                elif time.time() > timeout_appear or (detector and detector.poll()):
+                    return
+                if time.time() > timeout_warn:
+                    warn('Wait ALL elements to be absent. locators = %s, '
+                         'check_visibility_only = [%s], time elapsed = [%s]s.',
+                         locators, check_visibility_only, time.time() - start_time)
 
-            time.sleep(self._WAIT_INTERVAL)
-            if time.time() > timeout:
-                raise TimeoutError(
-                    'Wait ALL elements to be absent. locators = %s, '
-                    'check_visibility_only = [%s], time elapsed = [%s]s.' %
-                    (locators, check_visibility_only, time.time() - start_time))
+                time.sleep(self._WAIT_INTERVAL)
+                if time.time() > timeout:
+                    raise TimeoutError(
+                        'Wait ALL elements to be absent. locators = %s, '
+                        'check_visibility_only = [%s], time elapsed = [%s]s.' %
+                        (locators, check_visibility_only, time.time() - start_time))
 
-    def _wait_invisible(self, locators, timeout_warn=None, minwait=3,
+    def _wait_invisible(self, locators, timeout_warn=None, minwait=None,
                         handlers=None, timeout=None):
         self._wait_absent(locators, timeout_warn, minwait, handlers, timeout, check_visibility_only=True)
 
+    @_polling
     def _watch(self, handlers, max_duration=5):
         timeout = time.time() + max_duration
         while True:
+            self._start_poll()
             handlers = self._consult_handlers(handlers)
             if not handlers: break
             if time.time() > timeout: break
 
+    @_probing
     def _consult_handlers(self, handlers):
         if not handlers: return
 
-        # convert handlers to a mutable list of (locator, handler)
+        # convert handlers to a mutable list of (locator, handler). the order
+        # of a dict is arbitrary, so it is reordered by hit rate if possible.
         if isinstance(handlers, dict):
             handlers = handlers.items()
+            if self._LOCATOR_STATS and self._REORDER_LOCATORS:
+                keyed = self._order_locators([h[0] for h in handlers])
+                order = dict((id(locator), index) for index, (key, locator) in enumerate(keyed))
+                handlers.sort(key=lambda h: order[id(h[0])])
         handlers = list(handlers)
         _logger.debug('Consult handlers. handlers = %s.', [h[0] for h in handlers])
 
@@ -364,9 +833,18 @@ class PageObject(object):
             _logger.debug('The locator (%s) did not resolve to an element.', locator)
             element = None
 
+        if self._LOCATOR_STATS:
+            self._record_locator(self._LOCATOR_STATS.key_of(locator), bool(element))
+
         # consult the handler again later, or drop it.
         del handlers[0]
-        if not element or not self._is_displayed(element) or handler(element):
+        if element:
+            element = self._displayed_element(locator, element)
+        if element:
+            with self._timed('handler', getattr(handler, '__name__', repr(handler))):
+                again = handler(element)
+            self._ui_changed() # that's what handlers are for
+        if not element or again:
             handlers.append((locator, handler))
 
         _logger.debug('Rotated/modified handlers: %s', [h[0] for h in handlers])
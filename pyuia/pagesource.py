@@ -0,0 +1,34 @@
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+__all__ = ['parse_page_source']
+
+_CHUNK_SIZE = 64 * 1024
+
+def parse_page_source(source, root=None):
+    """Parse XML page source into an element tree.
+
+    The source is fed to the parser chunk by chunk, so that no encoded copy of
+    the whole (possibly several MB) source is made.
+
+    Args:
+        source: The page source, either a string or a file-like object.
+        root: An ElementTree path (e.g., ".//*[@resource-id='list']") to prune
+            the tree to the subtree rooted at the first matching element.
+
+    Returns: The root element, or `None` if `root` matches nothing.
+
+    """
+    parser = ElementTree.XMLParser()
+    if hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(_CHUNK_SIZE), ''):
+            parser.feed(chunk)
+    else:
+        for offset in xrange(0, len(source), _CHUNK_SIZE):
+            chunk = source[offset:offset + _CHUNK_SIZE]
+            parser.feed(chunk.encode('utf-8') if isinstance(chunk, unicode) else chunk)
+    tree = parser.close()
+
+    return tree if root is None else tree.find(root)
@@ -1,3 +1,5 @@
 from library import *
 from util import *
+from pool import *
+from report import *
 
@@ -1,6 +1,7 @@
 import logging, inspect
 from robot.utils import ConnectionCache
-from pyuia import PageObject, get_page_object
+from pyuia import PageObject, get_page_object, clear_page_objects
+from report import TimingReport
 from util import is_test_failed, log_screenshot, log_text, in_context as in_robot_context
 
 __all__ = ['BaseAppLibrary']
@@ -52,11 +53,35 @@ class BaseAppLibrary(object):
 
     ROBOT_LIBRARY_SCOPE = 'GLOBAL'
 
+    # a `SessionPool` shared by sessions, or `None` to terminate the session
+    # as soon as it is closed.
+    _SESSION_POOL = None
+
+    # whether to write page source artifacts gzipped.
+    _COMPRESS_PAGE_SOURCE = False
+
+    # whether to report time spent on pages per test/suite. See `TimingReport`.
+    _TIMING_REPORT = True
+
     if in_robot_context:
         __metaclass__ = _StateCapturing
 
     def __init__(self):
         self._cache = ConnectionCache()
+        if self._TIMING_REPORT:
+            self._install_timing_report()
+
+    def _install_timing_report(self):
+        # keep listeners declared by subclasses; Robot accepts a list of them.
+        listeners = getattr(self, 'ROBOT_LIBRARY_LISTENER', None)
+        if listeners is None:
+            listeners = []
+        elif not isinstance(listeners, (list, tuple)):
+            listeners = [listeners]
+
+        if not any(isinstance(listener, TimingReport) for listener in listeners):
+            listeners = list(listeners) + [TimingReport()]
+        self.ROBOT_LIBRARY_LISTENER = listeners[0] if len(listeners) == 1 else listeners
 
     def open_session(self, device_id, alias=None):
         """Open a session.
@@ -68,11 +93,18 @@ class BaseAppLibrary(object):
 
         """
         _logger.info('Open session; device ID = [%s], alias = [%s])', device_id, alias)
-        # init context and install delegates
-        context = self._init_context(device_id)
+        pool = self._SESSION_POOL
+        key = self._get_session_key(device_id) if pool else None
+
+        # reuse a pooled context (app state is reset by the next `Open App`)
+        # or init one, and install delegates
+        context = pool.acquire(key) if pool else None
+        reset_pending = context is not None
+        if not context:
+            context = self._init_context(device_id)
         context._log_screenshot_delegate = self._log_screenshot_delegate
         context._log_page_source_delegate = self._log_page_source_delegate
-        self._cache.register(RFConnectionCache(context), alias)
+        self._cache.register(RFConnectionCache(context, pool, key, reset_pending), alias)
 
     def open_app(self, reset=None):
         """Open the app.
@@ -86,7 +118,11 @@ class BaseAppLibrary(object):
 
         """
         msg = 'App logs (initial)'
-        context = self._current_context
+        connection = self._cache.current
+        context = connection._context
+        if connection.reset_pending: # a pooled context, see `Open Session`
+            connection.reset_pending = False
+            reset = True
         context.open_app(bool(reset))
 
         context.logs_all = [] # accumulate logs of each step
@@ -95,6 +131,11 @@ class BaseAppLibrary(object):
     def _init_context(self):
         raise NotImplementedError()
 
+    def _get_session_key(self, device_id):
+        """Return the key for looking up pooled contexts. Override this to take
+        capabilities into account if they vary for the same device."""
+        return device_id
+
     def _log_screenshot_delegate(self, msg, *args, **kwargs):
         level = kwargs['level'] if 'level' in kwargs else logging.DEBUG
         if not _logger.isEnabledFor(level):
@@ -104,7 +145,11 @@ class BaseAppLibrary(object):
         msg = msg % args
 
         if page: msg += ' (%s)' % page.__class__.__name__
-        log_screenshot(self._current_context.take_screenshot_as_png(), msg, level=level)
+        png = kwargs['png'] if 'png' in kwargs else None # taken in advance
+        if not png:
+            options = dict((key, kwargs[key]) for key in ('element', 'region', 'scale') if key in kwargs)
+            png = self._current_context.take_screenshot_as_png(**options)
+        log_screenshot(png, msg, level=level)
 
     def _log_page_source_delegate(self, msg, *args, **kwargs):
         level = kwargs['level'] if 'level' in kwargs else logging.DEBUG
@@ -116,7 +161,8 @@ class BaseAppLibrary(object):
 
         if page: msg += ' (%s)' % page.__class__.__name__
         source, ext = self._current_context.dump_page_source()
-        log_text(source, msg, prefix='page_source_', suffix='.%s' % ext, level=level)
+        log_text(source, msg, prefix='page_source_', suffix='.%s' % ext, level=level,
+                 compress=self._COMPRESS_PAGE_SOURCE)
 
     def close_session(self):
         """Terminate current session."""
@@ -176,11 +222,27 @@ class BaseAppLibrary(object):
 
 class RFConnectionCache(object):
 
-    def __init__(self, context):
+    def __init__(self, context, pool=None, key=None, reset_pending=False):
         self._context = context
+        self._pool = pool
+        self._key = key
+        self.reset_pending = reset_pending # reset app state on the next `Open App`
 
     def close(self):
-        self._context.quit()
+        clear_page_objects(self._context)
+        if self._pool:
+            self._clear_session_state()
+            self._pool.release(self._key, self._context)
+        else:
+            self._context.quit()
+
+    def _clear_session_state(self):
+        context = self._context
+        context.logs_all = []
+        context.current_page = None
+        log_filter = getattr(context, 'log_filter', None)
+        if log_filter:
+            log_filter.resolved_pids = []
 
     def close_app(self):
         # all statements suppress possible errors, or other sessions won't be closed.
@@ -0,0 +1,71 @@
+import time, atexit, logging
+from pyuia import clear_page_objects
+
+__all__ = ['SessionPool']
+_logger = logging.getLogger(__name__)
+
+class SessionPool(object):
+    """A pool of contexts (sessions) kept alive across suites.
+
+    Contexts are keyed by `BaseAppLibrary._get_session_key(device_id)`. A
+    released context is reused by the next session with the same key, after
+    a health check. Remaining contexts are terminated on exit.
+
+    Args:
+        max_uses: The maximum number of sessions served by a context. Defaults
+            to `None`, i.e., unlimited.
+        idle_timeout: The number of seconds an idle context is kept alive.
+            Defaults to `None`, i.e., forever.
+
+    """
+
+    def __init__(self, max_uses=None, idle_timeout=None):
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self._idle = {} # {key: [(context, released_at)]}
+        self._uses = {} # {id(context): uses}
+        atexit.register(self.quit_all)
+
+    def acquire(self, key):
+        """Return a healthy idle context for the key, or `None`."""
+        idle = self._idle.get(key, [])
+        while idle:
+            context, released_at = idle.pop()
+            if self.idle_timeout is not None and time.time() - released_at > self.idle_timeout:
+                _logger.debug('Evict an idle context; key = [%s]', key)
+                self.discard(context)
+                continue
+
+            if not context.is_alive():
+                _logger.debug('Evict an unhealthy context; key = [%s]', key)
+                self.discard(context)
+                continue
+
+            _logger.info('Reuse a context; key = [%s], uses = [%s]', key, self._uses[id(context)])
+            return context
+
+    def release(self, key, context):
+        uses = self._uses.get(id(context), 0) + 1
+        self._uses[id(context)] = uses
+
+        if self.max_uses is not None and uses >= self.max_uses:
+            _logger.debug('Evict a context used %s times; key = [%s]', uses, key)
+            self.discard(context)
+            return
+
+        self._idle.setdefault(key, []).append((context, time.time()))
+
+    def quit_all(self):
+        for key, idle in self._idle.items():
+            for context, released_at in idle:
+                self.discard(context)
+        self._idle.clear()
+
+    def discard(self, context):
+        """Terminate the context instead of returning it to the pool."""
+        self._uses.pop(id(context), None)
+        clear_page_objects(context)
+        try:
+            context.quit()
+        except Exception:
+            _logger.warning('Fail to quit the context.', exc_info=True)
@@ -0,0 +1,50 @@
+import json, logging, os.path as path
+from pyuia import timings, summarize
+from util import _get_log_dir
+
+__all__ = ['TimingReport']
+_logger = logging.getLogger(__name__)
+
+class TimingReport(object):
+    """A Robot listener reporting time spent on page transitions, waits,
+    handlers and page entry, per test and per suite.
+
+    Summaries (count, total, p50, p90, p99 and max in seconds, grouped by
+    category and name) are appended to `pyuia_timings.jsonl` next to the log
+    file, one JSON object per test or suite.
+
+    """
+
+    ROBOT_LISTENER_API_VERSION = 2
+    FILENAME = 'pyuia_timings.jsonl'
+
+    def __init__(self, recorder=timings):
+        self._recorder = recorder
+        self._suites = [] # stack of records of each (nested) suite
+
+    def start_suite(self, name, attrs):
+        records = self._recorder.drain() # e.g., parent suite setup
+        if self._suites:
+            self._suites[-1].extend(records)
+        self._suites.append([])
+
+    def end_test(self, name, attrs):
+        records = self._recorder.drain()
+        self._suites[-1].extend(records)
+        self._write({'test': attrs['longname'], 'status': attrs['status'],
+                     'elapsed': attrs['elapsedtime'] / 1000.0, 'timings': summarize(records)})
+
+    def end_suite(self, name, attrs):
+        records = self._suites.pop()
+        records.extend(self._recorder.drain()) # e.g., suite setup/teardown
+        if self._suites:
+            self._suites[-1].extend(records)
+        self._write({'suite': attrs['longname'], 'status': attrs['status'],
+                     'elapsed': attrs['elapsedtime'] / 1000.0, 'timings': summarize(records)})
+
+    def _write(self, report):
+        try:
+            with open(path.join(_get_log_dir(), self.FILENAME), 'a') as f:
+                f.write(json.dumps(report, sort_keys=True) + '\n')
+        except Exception:
+            _logger.warning('Fail to write the timing report.', exc_info=True)
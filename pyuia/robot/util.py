@@ -1,22 +1,28 @@
-import logging, os.path as path, time
+import os, re, sys, json, shutil, hashlib, logging, itertools, os.path as path, time, gzip
 
-__all__ = ['in_context', 'get_current_test_case', 'log_screenshot', 'log_text', 'is_test_failed']
+__all__ = ['in_context', 'get_current_test_case', 'log_screenshot', 'log_text', 'is_test_failed',
+           'merge_artifacts']
 _log = logging.getLogger(__name__)
 
-try:
+# Robot's execution contexts won't be there unless Robot has already been
+# loaded, so don't bother importing it, e.g., while generating docs.
+if 'robot.running.context' in sys.modules:
     from robot.running.context import EXECUTION_CONTEXTS as contexts
     in_context = True if contexts.current else False
-except ImportError:
+else:
     in_context = False
 
-try:
-    from robot.libraries.BuiltIn import BuiltIn
-    _builtin = BuiltIn()
-except ImportError:
-    _builtin = None
+_builtin = None
+
+def _get_builtin():
+    global _builtin
+    if _builtin is None:
+        from robot.libraries.BuiltIn import BuiltIn
+        _builtin = BuiltIn()
+    return _builtin
 
 def is_test_failed():
-    status = _builtin.get_variable_value('${TEST_STATUS}')
+    status = _get_builtin().get_variable_value('${TEST_STATUS}')
     if status == 'FAIL': return True
     assert status in ['PASS', None], status
     return False
@@ -27,8 +33,9 @@ def get_current_test_case():
        Returns: 2-tuple (suite_source, test_name), where suite_source is an
                 absolute path to the suite file or directory.
     """
-    return (_builtin.get_variable_value('${SUITE_SOURCE}'),
-            _builtin.get_variable_value('${TEST_NAME}'))
+    builtin = _get_builtin()
+    return (builtin.get_variable_value('${SUITE_SOURCE}'),
+            builtin.get_variable_value('${TEST_NAME}'))
 
 def _robot_logger_of_level(level):
     # standard levels: DEBUG, INFO, WARNING, ERROR, CRITICAL
@@ -46,31 +53,120 @@ def _robot_logger_of_level(level):
         assert False, level
 
 def log_screenshot(png, msg='SCREENSHOT', prefix='screenshot_', level=logging.DEBUG):
-    filename = '%s%s.png' % (prefix, int(time.time() * 1000))
-    pathname = path.join(_get_log_dir(), filename)
+    pathname, href = _new_artifact(prefix, '.png')
     with open(pathname, 'wb') as f:
         f.write(png)
-    html = '<a href="%s" target="_blank"><img src="%s" width="200"></a>' % (filename, filename)
+    _index_artifact(pathname, msg, level)
+    html = '<a href="%s" target="_blank"><img src="%s" width="200"></a>' % (href, href)
 
     msg = '%s<br/>%s' % (msg, html) # TODO: HTML encode msg
     _robot_logger_of_level(level)(msg, html=True)
 
-def log_text(text, msg='TEXT', prefix='text', suffix='.txt', level=logging.DEBUG):
-    from robot.api import logger as robot_logger
-
-    filename = '%s%s%s' % (prefix, int(time.time() * 1000), suffix)
-    pathname = path.join(_get_log_dir(), filename)
-    with open(pathname, 'wb') as f:
-	f.write(text.encode('utf-8'))
-    html = '<a href="%s" target="_blank">%s</a>' % (filename, filename)
+def log_text(text, msg='TEXT', prefix='text', suffix='.txt', level=logging.DEBUG, compress=False):
+    if compress: suffix += '.gz'
+    pathname, href = _new_artifact(prefix, suffix)
+    with (gzip.open if compress else open)(pathname, 'wb') as f:
+        f.write(text.encode('utf-8'))
+    _index_artifact(pathname, msg, level)
+    html = '<a href="%s" target="_blank">%s</a>' % (href, path.basename(href))
 
     msg = '%s: %s' % (msg, html) # TODO: HTML encode msg
     _robot_logger_of_level(level)(msg, html=True)
 
-def _get_log_dir(): # TODO: one-time calculation
-    variables = _builtin.get_variables()
-    outdir = variables['${OUTPUT_DIR}']
-    log = variables['${LOGFILE}'] # relative to the output dir
-    logdir = path.dirname(log) if log != 'NONE' else '.'
-    return path.abspath(path.join(outdir, logdir))
+# Artifacts are sharded by process, suite and test, i.e.,
+# <log dir>/pyuia-artifacts/<process>/<suite>/<test>/, so that parallel runs
+# (e.g., pabot) neither overwrite each other's files nor crowd a directory.
+# Each shard has an index (one JSON object per artifact). See `merge_artifacts`.
+ARTIFACTS_DIR = 'pyuia-artifacts'
+INDEX_FILE = 'index.jsonl'
+
+_log_dir = None
+_shard_dirs = set() # created so far
+_artifact_counter = itertools.count()
+
+def _new_artifact(prefix, suffix):
+    """Return the path to a new artifact, and its URL relative to the log file."""
+    builtin = _get_builtin()
+    suite = builtin.get_variable_value('${SUITE_NAME}') or 'suite'
+    test = builtin.get_variable_value('${TEST_NAME}') or '_suite' # suite setup/teardown
+    shard = path.join(ARTIFACTS_DIR, _get_process_name(), _safe_name(suite), _safe_name(test))
+
+    shard_dir = path.join(_get_log_dir(), shard)
+    if shard_dir not in _shard_dirs:
+        if not path.isdir(shard_dir):
+            os.makedirs(shard_dir)
+        _shard_dirs.add(shard_dir)
+
+    # unique within the process, and the process has a shard of its own.
+    filename = '%s%s_%s%s' % (prefix, int(time.time() * 1000), next(_artifact_counter), suffix)
+    return path.join(shard_dir, filename), '/'.join(shard.split(os.sep) + [filename])
+
+def _index_artifact(pathname, msg, level):
+    entry = {'file': path.basename(pathname), 'msg': msg,
+             'level': logging.getLevelName(level), 'time': time.time()}
+    with open(path.join(path.dirname(pathname), INDEX_FILE), 'a') as f:
+        f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+def _get_process_name():
+    # pabot assigns each process (of a run) an index
+    index = _get_builtin().get_variable_value('${PABOTQUEUEINDEX}')
+    return 'pabot%s' % index if index is not None else 'pid%s' % os.getpid()
+
+def _safe_name(name, max_length=64):
+    """Return a directory name for the (suite or test) name. A short hash of the
+    name keeps it unique, however the name is sanitized or truncated."""
+    digest = hashlib.md5(name.encode('utf-8') if isinstance(name, unicode) else name).hexdigest()[:8]
+    return '%s-%s' % (re.sub(r'[^\w.-]+', '_', name, flags=re.UNICODE)[:max_length], digest)
+
+def _get_log_dir():
+    global _log_dir
+    if _log_dir is None: # constant during a run
+        variables = _get_builtin().get_variables()
+        outdir = variables['${OUTPUT_DIR}']
+        log = variables['${LOGFILE}'] # relative to the output dir
+        logdir = path.dirname(log) if log != 'NONE' else '.'
+        _log_dir = path.abspath(path.join(outdir, logdir))
+    return _log_dir
+
+def merge_artifacts(outdir, result_dirs=()):
+    """Gather artifacts of parallel runs, and merge indexes of all shards.
+
+    Shards under the result directories (e.g., `pabot_results/*`) are moved
+    to `outdir`, where the combined log is written by pabot (or rebot), so
+    that links in the log remain valid. Indexes are merged into
+    `<outdir>/pyuia-artifacts/index.jsonl`, with paths relative to `outdir`.
+
+    Example:
+
+        merge_artifacts('results', glob.glob('results/pabot_results/*'))
+
+    Returns: The number of artifacts indexed.
+
+    """
+    target_root = path.join(outdir, ARTIFACTS_DIR)
+    for result_dir in result_dirs:
+        source_root = path.join(result_dir, ARTIFACTS_DIR)
+        for dirpath, dirnames, filenames in os.walk(source_root):
+            target_dir = path.join(target_root, path.relpath(dirpath, source_root))
+            if filenames and not path.isdir(target_dir):
+                os.makedirs(target_dir)
+            for filename in filenames:
+                shutil.move(path.join(dirpath, filename), path.join(target_dir, filename))
+
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(target_root):
+        if INDEX_FILE not in filenames or dirpath == target_root: continue
+        shard = path.relpath(dirpath, outdir)
+        with open(path.join(dirpath, INDEX_FILE)) as f:
+            for line in f:
+                entry = json.loads(line)
+                entry['file'] = '/'.join(shard.split(os.sep) + [entry['file']])
+                entries.append(entry)
 
+    entries.sort(key=lambda entry: entry['time'])
+    if not path.isdir(target_root):
+        os.makedirs(target_root)
+    with open(path.join(target_root, INDEX_FILE), 'w') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, sort_keys=True) + '\n')
+    return len(entries)
@@ -1,3 +1,4 @@
 from pageobject import *
 from context import *
+from replay import *
 
@@ -1,19 +1,102 @@
+import logging
+from io import BytesIO
+from contextlib import contextmanager
 from pyuia import AppContext
 
 __all__ = ['SeleniumContext']
+_logger = logging.getLogger(__name__)
 
 class SeleniumContext(AppContext):
 
-    def __init__(self, driver):
+    def __init__(self, driver, implicit_wait=None):
+        """
+        Args:
+            implicit_wait: The implicit wait (in seconds) configured on the
+                driver. Defaults to `None`, i.e., read it from the driver when
+                polling for the first time. To change it later, call
+                `implicitly_wait` rather than the driver's.
+
+        """
         self.driver = driver
         platform = driver.desired_capabilities['platformName']
         AppContext.__init__(self, platform)
+        self._implicit_wait = implicit_wait # configured, or None if unknown
+        self._current_implicit_wait = implicit_wait
+        self._implicit_wait_unknown = False # fail to read it from the driver
+        self._polling_depth = 0
+
+    def implicitly_wait(self, seconds):
+        """Configure the implicit wait, which is restored after polling."""
+        self._implicit_wait = seconds
+        if not self._polling_depth:
+            self._apply_implicit_wait(seconds)
+
+    def _get_implicit_wait(self):
+        """Return the configured implicit wait, or `None` if it is unknown."""
+        if self._implicit_wait is None and not self._implicit_wait_unknown:
+            try:
+                _register_get_timeouts(self.driver)
+                timeouts = self.driver.execute('getTimeouts')['value'] # W3C
+                self._implicit_wait = self._current_implicit_wait = timeouts['implicit'] / 1000.0
+            except Exception:
+                _logger.debug('Fail to read the implicit wait from the driver, so it is not turned off '
+                              'while polling. Declare it with `implicit_wait` or `implicitly_wait`.',
+                              exc_info=True)
+                self._implicit_wait_unknown = True
+        return self._implicit_wait
+
+    def _apply_implicit_wait(self, seconds):
+        if seconds == self._current_implicit_wait: return # redundant
+        self.driver.implicitly_wait(seconds)
+        self._current_implicit_wait = seconds
+
+    @contextmanager
+    def polling(self):
+        """Turn off the implicit wait until the (outermost) polling ends."""
+        self._polling_depth += 1
+        managed = False
+        try:
+            if self._polling_depth == 1 and self._get_implicit_wait() is not None:
+                managed = True
+                self._apply_implicit_wait(0)
+            yield
+        finally:
+            self._polling_depth -= 1
+            if managed:
+                try:
+                    self._apply_implicit_wait(self._implicit_wait)
+                except Exception: # never mask the outcome of polling
+                    _logger.warning('Fail to restore the implicit wait.', exc_info=True)
 
     def dump_page_source(self):
         return (self.driver.page_source, 'html')
 
-    def take_screenshot_as_png(self):
-        return self.driver.get_screenshot_as_png()
+    def take_screenshot_as_png(self, element=None, region=None, scale=None):
+        from selenium.common.exceptions import WebDriverException
+        if callable(element): # a locator
+            try:
+                element = element()
+            except Exception: # capturing is the best effort
+                _logger.debug('Fail to resolve the element to capture. Capture the screen instead.', exc_info=True)
+                element = None
+
+        if element is not None:
+            try:
+                png = element.screenshot_as_png # not supported by all drivers
+                return _crop_png(png, None, scale) if scale else png
+            except (AttributeError, WebDriverException):
+                _logger.debug('Fail to take the element screenshot. Crop the screenshot instead.', exc_info=True)
+                region = _region_of(element)
+
+        png = self.driver.get_screenshot_as_png()
+        if not (region or scale): return png
+
+        # element locations are in points (e.g., iOS) or pixels (e.g., Android)
+        screen_width = self.driver.get_window_size()['width'] if region else None
+        return _crop_png(png, region, scale, screen_width)
+
+    def open_shortcut(self, url):
+        self.driver.get(url)
 
     def get_new_logs(self):
         raise NotImplementedError()
@@ -21,6 +104,50 @@ class SeleniumContext(AppContext):
     def get_initial_logs(self):
         return self.get_new_logs()
 
+    def is_alive(self):
+        try:
+            self.driver.get_window_size() # a cheap round trip
+            return True
+        except Exception:
+            return False
+
     def quit(self):
         self.driver.quit()
 
+def _region_of(element):
+    from selenium.common.exceptions import WebDriverException
+    try:
+        location, size = element.location, element.size
+        return (location['x'], location['y'], size['width'], size['height'])
+    except WebDriverException: # e.g., gone stale
+        return None
+
+def _register_get_timeouts(driver):
+    """Teach the driver the W3C command, which Selenium 3.141 (the last release
+    supporting Python 2) doesn't know."""
+    commands = getattr(getattr(driver, 'command_executor', None), '_commands', None)
+    if isinstance(commands, dict) and 'getTimeouts' not in commands:
+        commands['getTimeouts'] = ('GET', '/session/$sessionId/timeouts')
+
+def _crop_png(png, region=None, scale=None, screen_width=None):
+    """Crop the region (scaled to the size of the screenshot) out of the
+    screenshot, and then downscale it. Requires PIL (or Pillow); the screenshot
+    is returned as is if it is not available."""
+    try:
+        from PIL import Image
+    except ImportError:
+        _logger.debug('PIL is not installed. Screenshots are neither cropped nor scaled.')
+        return png
+
+    image = Image.open(BytesIO(png))
+    if region:
+        ratio = float(image.size[0]) / screen_width if screen_width else 1
+        x, y, width, height = [int(round(value * ratio)) for value in region]
+        image = image.crop((max(x, 0), max(y, 0), min(x + width, image.size[0]), min(y + height, image.size[1])))
+    if scale:
+        size = (max(int(image.size[0] * scale), 1), max(int(image.size[1] * scale), 1))
+        image = image.resize(size, Image.ANTIALIAS if hasattr(Image, 'ANTIALIAS') else Image.LANCZOS)
+
+    output = BytesIO()
+    image.save(output, 'PNG')
+    return output.getvalue()
@@ -1,17 +1,30 @@
 import sys, logging
 from pyuia import PageObject, cacheable
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
-from selenium.webdriver.common.by import By
+from pyuia.pageobject import _ELEMENTS_CACHE_ATTR
 
 __all__ = ['SeleniumPageObject', 'find_by', 'cacheable']
 _logger = logging.getLogger(__name__)
 
+_exceptions = None
+
+def _selenium_exceptions():
+    """Return `selenium.common.exceptions`, which is not imported until needed."""
+    global _exceptions
+    if _exceptions is None:
+        from selenium.common import exceptions
+        _exceptions = exceptions
+    return _exceptions
+
 class SeleniumPageObject(PageObject):
 
+    __slots__ = ()
+
     def __init__(self, context):
+        exceptions = _selenium_exceptions()
         PageObject.__init__(
             self, context,
-            (NoSuchElementException, StaleElementReferenceException))
+            (exceptions.NoSuchElementException, exceptions.StaleElementReferenceException),
+            exceptions.StaleElementReferenceException)
 
     @property
     def _driver(self):
@@ -19,22 +32,78 @@ class SeleniumPageObject(PageObject):
 
     def _is_displayed(self, element):
         try:
+            # a cached element re-resolves itself once it has gone stale, see `_wrap_cached`.
             displayed = element.is_displayed()
             _logger.debug('Element (%s) is displayed? %s.', element.id, displayed)
             return displayed
-        except StaleElementReferenceException:
+        except _selenium_exceptions().StaleElementReferenceException:
             logging.debug('Element (%s) is NOT displayed because of stale reference.', element.id)
             return False
 
+    def _wrap_cached(self, lookup, result):
+        from selenium.webdriver.remote.webelement import WebElement
+        if not isinstance(result, WebElement): return result
+        return _stale_proof(self, lookup, result)
+
+_stale_proof_classes = {} # {element class: subclass}
+
+def _stale_proof(page_object, lookup, element):
+    """Return a copy of the (cached) element which re-resolves itself with the
+    lookup, and retries, once a call hits a stale element reference. It remains
+    an instance of the element's class, e.g., for `execute_script` arguments."""
+    cls = element.__class__
+    if cls not in _stale_proof_classes:
+        _stale_proof_classes[cls] = type('StaleProof%s' % cls.__name__, (cls,), {
+            '__getattribute__': _stale_proof_getattribute,
+            '_pyuia_refresh': _stale_proof_refresh })
+
+    proxy = object.__new__(_stale_proof_classes[cls])
+    proxy.__dict__.update(element.__dict__)
+    proxy._pyuia_page, proxy._pyuia_lookup = page_object, lookup
+    return proxy
+
+def _stale_proof_getattribute(self, name):
+    get = object.__getattribute__
+    if name.startswith('_'): return get(self, name)
+
+    stale = get(self, '_pyuia_page')._stale_exceptions
+    try:
+        value = get(self, name) # properties, e.g., text, are evaluated here
+    except stale:
+        get(self, '_pyuia_refresh')()
+        value = get(self, name)
+    if not callable(value): return value
+
+    def call(*args, **kwargs):
+        try:
+            return value(*args, **kwargs)
+        except stale:
+            get(self, '_pyuia_refresh')()
+            return get(self, name)(*args, **kwargs)
+    return call
+
+def _stale_proof_refresh(self):
+    page_object, lookup = self._pyuia_page, self._pyuia_lookup
+    _logger.debug('The cached element (%s) is stale. Re-resolve it; lookup = %s', self.id, lookup)
+    try:
+        element = lookup(page_object)
+    except page_object._not_found_exceptions:
+        element = None
+    if element is None:
+        getattr(page_object, _ELEMENTS_CACHE_ATTR, {}).pop(id(lookup), None)
+        raise page_object._stale_exceptions[0]('The cached element has gone, and cannot be re-resolved.')
+    self.__dict__.update(element.__dict__) # e.g., the element ID
+
+# the values of `selenium.webdriver.common.by.By`, which is not imported until needed.
 _strategy_kwargs = {
-    'id_': By.ID,
-    'xpath': By.XPATH,
-    'link_text': By.LINK_TEXT,
-    'partial_link_text': By.PARTIAL_LINK_TEXT,
-    'name': By.NAME,
-    'tag_name': By.TAG_NAME,
-    'class_name': By.CLASS_NAME,
-    'css_selector': By.CSS_SELECTOR }
+    'id_': 'id',
+    'xpath': 'xpath',
+    'link_text': 'link text',
+    'partial_link_text': 'partial link text',
+    'name': 'name',
+    'tag_name': 'tag name',
+    'class_name': 'class name',
+    'css_selector': 'css selector' }
 
 from pyuia import cacheable as cacheable_decorator # naming conflict between global and parameter names
 
@@ -72,39 +141,99 @@ def find_by(how=None, using=None, multiple=False, cacheable=True, if_exists=Fals
         key = kwargs.keys()[0]
         _how, _using = _strategy_kwargs[key], kwargs[key]
 
+    # look up with a single query, if the context is not cacheable anyway.
+    composed_xpath = _compose_xpath(_how, _using, context)
+    how, using = ('xpath', composed_xpath) if composed_xpath else (_how, _using)
+
     def func(page_object):
+        exceptions = _selenium_exceptions()
         driver = getattr(page_object, driver_attr)
 
         # ctx - driver or a certain element
-        if context is None:
+        if context is None or composed_xpath:
             ctx = driver
             container = None
         elif callable(context):
-            container = ctx = context(page_object)
+            container = ctx = _resolve_context(page_object, context)
             if not ctx:
                 if if_exists:
                     return None
                 else:
-                    raise NoSuchElementException("The element as the context doesn't exist.")
+                    raise exceptions.NoSuchElementException("The element as the context doesn't exist.")
         else: # element
             container = ctx = context
 
-        lookup = ctx.find_elements if multiple else ctx.find_element
-
-        try:
-            return lookup(_how, _using)
-        except NoSuchElementException as e:
-            if if_exists: return None
-            msg = "%s ; find_by(how='%s', using='%s', multiple=%s, cacheable=%s, " \
-                  "if_exists=%s, context=%s)" % \
-                  (str(e), _how, repr(_using), multiple, cacheable, if_exists, context)
-            raise NoSuchElementException(msg), None, sys.exc_info()[2]
-
+        recovered = False
+        while True:
+            lookup = ctx.find_elements if multiple else ctx.find_element
+            try:
+                return lookup(how, using)
+            except exceptions.NoSuchElementException as e:
+                if if_exists: return None
+                msg = "%s ; find_by(how='%s', using='%s', multiple=%s, cacheable=%s, " \
+                      "if_exists=%s, context=%s)" % \
+                      (str(e), how, repr(using), multiple, cacheable, if_exists, context)
+                raise exceptions.NoSuchElementException(msg), None, sys.exc_info()[2]
+            except exceptions.StaleElementReferenceException:
+                # the (cached) context has gone stale; re-resolve it once.
+                if recovered or not callable(context): raise
+                container = ctx = _refresh_context(page_object, context)
+                recovered = True
+                if not ctx:
+                    if if_exists: return None
+                    raise exceptions.NoSuchElementException("The element as the context doesn't exist.")
+
+    func = _probing(func) if if_exists else func
     func = cacheable_decorator(func, cache_none=not if_exists) if cacheable else func
 
     # for debugging, expose criteria of the lookup
     func.__name__ = "find_by(how='%s', using=%s, multiple=%s, cacheable=%s, " \
                     "if_exists=%s, context=%s)" % \
                     (_how, repr(_using), multiple, cacheable, if_exists, context)
+
+    # for child lookups to resolve the context (see `_compose_xpath`)
+    func._pyuia_xpath = None if multiple else _absolute_xpath(_how, _using, context)
+    func._pyuia_cacheable = cacheable
+    return func
+
+def _probing(lookup):
+    """Make a lookup which may well miss (`if_exists`) fail fast. See `AppContext.polling`."""
+    def func(page_object):
+        with page_object._context.polling():
+            return lookup(page_object)
+    func._pyuia_unprobed = lookup # see `PageObject._fill_elements_cache`
     return func
 
+def _resolve_context(page_object, context):
+    # a context shared by child lookups is resolved once per poll
+    resolve_shared = getattr(page_object, '_resolve_shared', None)
+    return resolve_shared(context) if resolve_shared else context(page_object)
+
+def _refresh_context(page_object, context):
+    """Drop the cached element of a stale context, and resolve it again."""
+    _logger.debug('The context element is stale. Re-resolve it. context = %s', context)
+    if hasattr(context, 'invalidate'):
+        context.invalidate(page_object)
+    if hasattr(page_object, '_forget_shared'):
+        page_object._forget_shared(context)
+    return _resolve_context(page_object, context)
+
+def _absolute_xpath(how, using, context):
+    """Return the absolute XPath equivalent to finding an element with the
+    locator under the context, or `None` if there isn't one."""
+    if how != 'xpath': return None
+    if context is None:
+        return None if using.startswith('.') else using
+
+    # only simple relative paths, e.g., not unions ('.//a | .//b') or '..'
+    parent = getattr(context, '_pyuia_xpath', None)
+    if parent and using.startswith(('./', './/')) and '|' not in using:
+        return '(%s)[1]%s' % (parent, using[1:]) # the first match, as find_element does
+    return None
+
+def _compose_xpath(how, using, context):
+    """Return a single XPath for a lookup under a context that is not cacheable,
+    so that the context doesn't have to be resolved first, or `None`."""
+    if not callable(context) or getattr(context, '_pyuia_cacheable', True): return None
+    return _absolute_xpath(how, using, context)
+
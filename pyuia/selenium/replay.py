@@ -0,0 +1,193 @@
+import time, json, base64, logging
+from collections import defaultdict, deque
+
+__all__ = ['RecordingDriver', 'ReplayDriver']
+_logger = logging.getLogger(__name__)
+
+class RecordingDriver(object):
+    """Wrap a WebDriver (or an Appium driver) to record calls made through it.
+
+    Every method call and property access on the driver, and on elements found
+    through it (e.g., `find_element(s)`, `page_source`, `is_displayed`, `swipe`
+    and `get_log`), is recorded with its arguments, result (or error) and time
+    elapsed. The trace is saved to `path` as JSON on `quit()` or `save()`, and
+    can be served back by `ReplayDriver`.
+
+    Example:
+
+        context = AppiumContext(RecordingDriver(webdriver.Remote(...), 'trace.json'))
+
+    """
+
+    def __init__(self, driver, path):
+        self._driver = driver
+        self._path = path
+        self._events = []
+
+    def __getattr__(self, name):
+        return _record(self, None, self._driver, name)
+
+    def quit(self):
+        try:
+            _record(self, None, self._driver, 'quit')()
+        finally:
+            self.save()
+
+    def save(self):
+        with open(self._path, 'w') as f:
+            json.dump({'events': self._events}, f)
+        _logger.debug('%s calls recorded. (%s)', len(self._events), self._path)
+
+    def _add_event(self, target, kind, name, args, elapsed, result=None, error=None):
+        event = {'target': target, 'kind': kind, 'name': name, 'args': args, 'elapsed': elapsed}
+        if error is None:
+            event['result'] = _encode(result)
+        else:
+            event['error'] = [error.__class__.__name__, str(error)]
+        self._events.append(event)
+
+class _RecordingElement(object):
+
+    def __init__(self, recorder, element):
+        self._recorder = recorder
+        self._element = element
+        self.id = element.id
+
+    def __getattr__(self, name):
+        return _record(self._recorder, self.id, self._element, name)
+
+def _record(recorder, target, obj, name):
+    start_time = time.time()
+    try:
+        value = getattr(obj, name) # properties are evaluated here
+    except Exception as e:
+        recorder._add_event(target, 'get', name, None, time.time() - start_time, error=e)
+        raise
+
+    if not callable(value):
+        recorder._add_event(target, 'get', name, None, time.time() - start_time, result=value)
+        return _wrap(recorder, value)
+
+    def call(*args, **kwargs):
+        encoded_args = _encode([args, kwargs])
+        args, kwargs = _unwrap(args), dict((k, _unwrap(v)) for k, v in kwargs.items())
+
+        start_time = time.time()
+        try:
+            result = value(*args, **kwargs)
+        except Exception as e:
+            recorder._add_event(target, 'call', name, encoded_args, time.time() - start_time, error=e)
+            raise
+
+        recorder._add_event(target, 'call', name, encoded_args, time.time() - start_time, result=result)
+        return _wrap(recorder, result)
+
+    return call
+
+def _is_element(value):
+    return hasattr(value, 'id') and hasattr(value, 'is_displayed')
+
+def _wrap(recorder, value):
+    if isinstance(value, list):
+        return [_wrap(recorder, v) for v in value]
+    return _RecordingElement(recorder, value) if _is_element(value) else value
+
+def _unwrap(value):
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(v) for v in value)
+    return value._element if isinstance(value, _RecordingElement) else value
+
+def _encode(value):
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    elif isinstance(value, dict):
+        return dict((k, _encode(v)) for k, v in value.items())
+    elif isinstance(value, str): # bytes, e.g., screenshots
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return {'base64': base64.b64encode(value)}
+    elif value is None or isinstance(value, (unicode, int, long, float, bool)):
+        return value
+    elif isinstance(value, (_RecordingElement, _ReplayElement)) or _is_element(value):
+        return {'element': value.id}
+    else:
+        return {'repr': repr(value)}
+
+class ReplayDriver(object):
+    """Serve calls recorded by `RecordingDriver` back, without a device.
+
+    Calls are matched by target (the driver or an element), name and arguments,
+    and served in the recorded order, so the replay is deterministic as long
+    as the code under test makes the same calls.
+
+    Args:
+        path: The trace recorded by `RecordingDriver`.
+        time_scale: The factor applied to recorded time elapsed. Defaults to
+            1, i.e., as slow as recorded. Use 0 to serve calls immediately.
+
+    """
+
+    def __init__(self, path, time_scale=1):
+        self._time_scale = time_scale
+        self._queues = defaultdict(deque) # {(target, kind, name, args): events}
+        self._kinds = {} # {(target, name): kind}
+
+        with open(path) as f:
+            events = json.load(f)['events']
+        for event in events:
+            target, kind, name = event['target'], event['kind'], event['name']
+            self._queues[(target, kind, name, _key_of(event['args']))].append(event)
+            self._kinds[(target, name)] = kind
+
+    def __getattr__(self, name):
+        return _replay(self, None, name)
+
+    def _serve(self, target, kind, name, args):
+        queue = self._queues.get((target, kind, name, _key_of(args)))
+        if not queue:
+            raise RuntimeError('No (more) recorded %s of %s%s on %s.' % (
+                kind, name, '' if args is None else args, target or 'driver'))
+
+        event = queue.popleft()
+        if self._time_scale:
+            time.sleep(event['elapsed'] * self._time_scale)
+
+        if 'error' in event:
+            raise _exception_of(*event['error'])
+        return self._decode(event['result'])
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        elif isinstance(value, dict):
+            if 'element' in value: return _ReplayElement(self, value['element'])
+            if 'base64' in value: return base64.b64decode(value['base64'])
+            if 'repr' in value: return value['repr']
+            return dict((k, self._decode(v)) for k, v in value.items())
+        return value
+
+class _ReplayElement(object):
+
+    def __init__(self, replayer, id):
+        self._replayer = replayer
+        self.id = id
+
+    def __getattr__(self, name):
+        return _replay(self._replayer, self.id, name)
+
+def _replay(replayer, target, name):
+    kind = replayer._kinds.get((target, name))
+    if kind is None:
+        raise AttributeError('%s of %s is never recorded.' % (name, target or 'driver'))
+
+    if kind == 'get':
+        return replayer._serve(target, 'get', name, None)
+    return lambda *args, **kwargs: replayer._serve(target, 'call', name, _encode([args, kwargs]))
+
+def _key_of(encoded_args):
+    return json.dumps(encoded_args, sort_keys=True)
+
+def _exception_of(cls_name, msg):
+    from selenium.common import exceptions
+    return getattr(exceptions, cls_name, exceptions.WebDriverException)(msg)
@@ -0,0 +1,82 @@
+import os, json, atexit, logging
+
+__all__ = ['LocatorStats']
+_logger = logging.getLogger(__name__)
+
+class LocatorStats(object):
+    """Hit/miss statistics of locators, optionally persisted to a local file.
+
+    Any-of checks (e.g., `PageObject._assert_any_present`) record a miss for
+    each locator tried without success, and a hit for the one that resolved.
+    The statistics are used to try the most likely match first. Locators are
+    identified by the page attributes they are bound from; others (e.g.,
+    lambdas) are not tracked.
+
+    Args:
+        path: The file to load statistics from and save them to (on exit).
+            Defaults to `None`, i.e., in-memory statistics only.
+
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._stats = {} # {key: [hits, misses]}
+        self._names = {} # {(page_class, function): attribute name}
+
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def key_of(self, locator):
+        """Return a key that identifies the locator across runs, i.e., the name
+        of the page attribute it is bound from, or `None` if there isn't one,
+        e.g., lambdas."""
+        func, page = getattr(locator, '__func__', None), getattr(locator, '__self__', None)
+        if func is None or page is None: return None
+
+        cls = page.__class__
+        if (cls, func) not in self._names:
+            self._names[(cls, func)] = _attr_name_of(cls, func)
+        name = self._names[(cls, func)]
+        return '%s.%s:%s' % (cls.__module__, cls.__name__, name) if name else None
+
+    def record(self, key, hit):
+        entry = self._stats.setdefault(key, [0, 0])
+        entry[0 if hit else 1] += 1
+
+    def hit_rate(self, key):
+        # Laplace smoothing; locators never seen before are rated 0.5.
+        hits, misses = self._stats.get(key, (0, 0))
+        return (hits + 1.0) / (hits + misses + 2.0)
+
+    def sort(self, keyed_items):
+        """Sort (key, item) pairs by hit rate in descending order.
+
+        The sort is stable, so items of the same rate keep their source order.
+
+        """
+        return sorted(keyed_items, key=lambda pair: -self.hit_rate(pair[0]))
+
+    def load(self):
+        if not os.path.exists(self.path): return
+
+        try:
+            with open(self.path) as f:
+                self._stats = dict((key, list(value)) for key, value in json.load(f).items())
+        except (IOError, ValueError):
+            _logger.warning('Fail to load locator stats. (%s)', self.path, exc_info=True)
+
+    def save(self):
+        if not self.path: return
+
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self._stats, f, indent=1, sort_keys=True)
+        except IOError:
+            _logger.warning('Fail to save locator stats. (%s)', self.path, exc_info=True)
+
+def _attr_name_of(cls, func):
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if value is func: return name
+    return None
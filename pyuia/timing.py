@@ -0,0 +1,62 @@
+import math, time
+from contextlib import contextmanager
+
+__all__ = ['TimingRecorder', 'timings', 'summarize']
+
+class TimingRecorder(object):
+    """Record time spent on page transitions, waits, handlers etc.
+
+    Args:
+        max_records: The maximum number of records kept until `drain` is
+            called. The older half is dropped once it is exceeded.
+
+    """
+
+    def __init__(self, max_records=100000):
+        self._records = [] # [(category, name, seconds)]
+        self._max_records = max_records
+
+    def record(self, category, name, seconds):
+        self._records.append((category, name, seconds))
+        if len(self._records) > self._max_records:
+            del self._records[:len(self._records) // 2]
+
+    @contextmanager
+    def timed(self, category, name):
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.time() - start_time)
+
+    def drain(self):
+        """Return records so far, and start over."""
+        records, self._records = self._records, []
+        return records
+
+timings = TimingRecorder() # used by page objects by default
+
+def _percentile(sorted_values, percent):
+    # nearest-rank method
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank - 1, 0)]
+
+def summarize(records):
+    """Summarize records as {category: {name: {count, total, p50, p90, p99, max}}}."""
+    groups = {}
+    for category, name, seconds in records:
+        groups.setdefault(category, {}).setdefault(name, []).append(seconds)
+
+    summary = {}
+    for category, names in groups.items():
+        for name, values in names.items():
+            values.sort()
+            summary.setdefault(category, {})[name] = {
+                'count': len(values),
+                'total': sum(values),
+                'p50': _percentile(values, 50),
+                'p90': _percentile(values, 90),
+                'p99': _percentile(values, 99),
+                'max': values[-1],
+            }
+    return summary